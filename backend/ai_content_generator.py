@@ -1,19 +1,50 @@
+import asyncio
 import os
 import time
 import numpy as np
 import moviepy.editor as mp
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 import requests
 from bs4 import BeautifulSoup
 import json
 import re
-from typing import Optional, Dict, List
-from gtts import gTTS
+from typing import Callable, Optional, Dict, List, Tuple
+
+from backgrounds import RandomNoiseBackground, get_background
+from layers import TypewriterText, composite, rasterize, text_sprite, tint
+from encoder import EncoderSettings, concat_files, write_clip
+from fonts import get_font, preload_fonts, text_width, wrap_words
+from mixer import mix
+from music import SAMPLE_RATE, stem_for_style, style_music_pcm
+from particles import LineLayer, ParticleLayer, ParticleSystem
+from pipeline import StageGraph
+from parallel_render import (
+    SegmentSequence, default_render_mode, default_render_workers, encode_segments, remove_files,
+    write_videofile_parallel
+)
+from render_profiles import DEFAULT_QUALITY, REFERENCE_SIZE, REFERENCE_WIDTH, get_profile
+from tts import VoiceoverSynthesizer
+
+# Fraction of the job done when each pipeline stage starts, for progress reports
+STAGE_PROGRESS = {'research': 0.0, 'script': 0.1, 'audio': 0.15, 'visuals': 0.3, 'encoding': 0.4, 'mux': 0.95}
 
 class AIContentGenerator:
-    def __init__(self):
+    def __init__(
+        self,
+        render_workers: Optional[int] = None,
+        render_mode: Optional[str] = None,
+        tts: Optional[VoiceoverSynthesizer] = None
+    ):
         self.temp_dir = "../temp"
+        self.render_workers = render_workers or default_render_workers()
+        # 'segments' encodes script segments in parallel, 'frames' splits the timeline
+        self.render_mode = render_mode or default_render_mode()
+        self.encoder_settings = EncoderSettings.from_env()
+        # Speech backend and per-segment cache (TTS_BACKEND=stub works offline)
+        self.tts = tts or VoiceoverSynthesizer()
         os.makedirs(self.temp_dir, exist_ok=True)
+        # Resolve the font fallback chain once instead of on every frame
+        preload_fonts()
         
     async def generate_reel(
         self,
@@ -22,52 +53,121 @@ class AIContentGenerator:
         duration: int = 15,
         image_paths: List[str] = [],
         audio_path: Optional[str] = None,
-        trending_data: Optional[Dict] = None
+        trending_data: Optional[Dict] = None,
+        quality: str = DEFAULT_QUALITY,
+        output_path: Optional[str] = None,
+        progress_callback: Optional[Callable[[str, float], None]] = None
     ) -> str:
-        """Generate AI content reel with research and voiceover"""
-        
-        timestamp = int(time.time())
-        output_path = f"../outputs/reel_{timestamp}.mp4"
+        """Generate AI content reel with research and voiceover.
+        
+        progress_callback, if given, is called with (stage, fraction done)
+        as the pipeline moves between steps.
+        """
+        
+        if output_path is None:
+            timestamp = int(time.time())
+            output_path = f"../outputs/reel_{timestamp}.mp4"
+        profile = get_profile(quality)
+        settings = profile.encoder_settings(self.encoder_settings)
+        
+        def report(stage: str, fraction: float):
+            if progress_callback:
+                progress_callback(stage, fraction)
+        
+        def stage_started(stage: str):
+            if stage in STAGE_PROGRESS:
+                report(stage, STAGE_PROGRESS[stage])
+        
+        def encoding_progress(fraction: float):
+            # Encoding takes up the span until the mux starts
+            start, end = STAGE_PROGRESS['encoding'], STAGE_PROGRESS['mux']
+            report('encoding', start + (end - start) * fraction)
+        
+        # Audio and visuals only depend on the script, so they run side by
+        # side, and the video track is rendered and encoded without audio as
+        # soon as the clips exist: TTS waits on the network while frames are
+        # encoded. Music needs nothing but the style and is mixed under any
+        # voiceover; the soundtrack is muxed in when the video is done
+        graph = StageGraph(on_start=stage_started)
+        graph.add('research', lambda: self._research_topic(prompt, style))
+        graph.add('music', lambda: self._generate_background_music(style, duration), executor=True)
+        graph.add('script', lambda research: self._generate_script(prompt, research, style, duration),
+                  after=('research',))
+        graph.add('audio', lambda script: self._generate_audio(prompt, script, style),
+                  after=('script',))
+        graph.add('visuals', lambda script: self._create_visual_content(script, style, duration, profile.size, profile.fps),
+                  after=('script',), executor=True)
+        graph.add('encoding',
+                  lambda visuals: self._encode_video(visuals, duration, output_path, profile, settings,
+                                                      encoding_progress),
+                  after=('visuals',), executor=True)
+        graph.add('combine',
+                  lambda visuals, audio, music: self._combine_content(visuals, audio, music, duration),
+                  after=('visuals', 'audio', 'music'))
+        graph.add('mux', lambda encoding, combine: concat_files(encoding, output_path, settings, combine),
+                  after=('encoding', 'combine'), executor=True)
         
         try:
             print(f"Researching topic: {prompt}")
-            
-            # Step 1: Research the topic
-            research_data = await self._research_topic(prompt, style)
-            
-            # Step 2: Generate script based on research
-            script = await self._generate_script(prompt, research_data, style, duration)
-            
-            # Step 3: Generate audio (voiceover or background music)
-            use_music_only = self._should_use_music_only(prompt, style)
-            if use_music_only:
-                voiceover_path = await self._generate_background_music(style, duration)
-            else:
-                voiceover_path = await self._generate_voiceover(script, style)
-            
-            # Step 4: Create visual content based on script
-            visual_clips = await self._create_visual_content(script, style, duration)
-            
-            # Step 5: Combine visuals and audio
-            final_video = await self._combine_content(visual_clips, voiceover_path, duration)
-            
-            # Step 6: Export final video
-            print(f"Exporting final reel...")
-            final_video.write_videofile(
-                output_path,
-                fps=24,
-                codec='libx264',
-                verbose=False,
-                logger=None
-            )
+            await graph.run()
+            graph.print_spans()
             
             print(f"AI reel created: {output_path}")
+            report('done', 1.0)
             return output_path
             
         except Exception as e:
             print(f"Error generating AI reel: {e}")
             # Fallback to simple reel
-            return await self._create_fallback_reel(prompt, style, duration, output_path)
+            report('fallback', 0.9)
+            output_path = await self._create_fallback_reel(prompt, style, duration, output_path, profile)
+            report('done', 1.0)
+            return output_path
+        
+        finally:
+            # Video-only intermediates; run() only returns once the encoder thread has
+            remove_files(graph.stages['encoding'].result or [])
+    
+    async def _generate_audio(self, prompt: str, script: Dict, style: str) -> Optional[np.ndarray]:
+        """Voiceover of the script, or None for list-style prompts that play over music alone"""
+        if self._should_use_music_only(prompt, style):
+            return None
+        return await self._generate_voiceover(script, style)
+    
+    def _encode_video(
+        self, visual_clips: List, duration: int, output_path: str, profile, settings: EncoderSettings,
+        progress: Optional[Callable[[float], None]] = None
+    ) -> List[str]:
+        """Render and encode the video track without audio, using the configured parallel render mode.
+        
+        Returns the intermediate files in playback order; they are joined
+        and the soundtrack muxed in with concat_files. progress is called
+        with the fraction of frames encoded so far.
+        """
+        print(f"Encoding video ({profile.name}: {profile.width}x{profile.height} @ {profile.fps} fps)...")
+        clips = visual_clips or [self._create_fallback_clip(duration, profile.size)]
+        stem = os.path.splitext(os.path.basename(output_path))[0]
+        if self.render_workers > 1 and len(clips) > 1 and self.render_mode == 'segments':
+            # Each segment encodes in its own process and is joined by stream copy
+            segments = [(clip.make_frame, clip.duration) for clip in clips]
+            return encode_segments(segments, stem, fps=profile.fps, size=profile.size, settings=settings,
+                                   workers=self.render_workers, temp_dir=self.temp_dir, progress=progress)
+        
+        video_path = os.path.join(self.temp_dir, f"{stem}_video.mp4")
+        try:
+            if self.render_workers > 1 and visual_clips:
+                # Segment renderers are picklable, so frames can be rendered across cores
+                renderer = SegmentSequence([(clip.make_frame, clip.duration) for clip in clips])
+                write_videofile_parallel(renderer, renderer.duration, video_path, fps=profile.fps,
+                                         size=profile.size, settings=settings, workers=self.render_workers,
+                                         progress=progress)
+            else:
+                write_clip(mp.concatenate_videoclips(clips), video_path, fps=profile.fps, settings=settings,
+                           progress=progress)
+        except BaseException:
+            remove_files([video_path])
+            raise
+        return [video_path]
     
     async def _research_topic(self, prompt: str, style: str) -> Dict:
         """Research the topic using web search and APIs"""
@@ -332,7 +432,7 @@ class AIContentGenerator:
         return script
     
     def _should_use_music_only(self, prompt: str, style: str) -> bool:
-        """Determine if we should use background music instead of voiceover"""
+        """Determine if the reel should play over music alone, without a voiceover"""
         
         # Use music for visual content like plans, lists, step-by-step guides
         music_keywords = ['plan', 'routine', 'workout', 'exercise', 'steps', 'list', 'guide', 
@@ -374,143 +474,32 @@ class AIContentGenerator:
         style_hooks = hooks.get(style, hooks['trendy'])
         return style_hooks[0]  # Use first hook for consistency
     
-    async def _generate_voiceover(self, script: Dict, style: str) -> str:
-        """Generate TTS voiceover from script"""
-        
-        # Combine all text segments
-        full_text = " ".join([segment['text'] for segment in script['segments']])
-        
-        # Clean text for TTS
-        clean_text = re.sub(r'[^\w\s.,!?]', '', full_text)
+    async def _generate_voiceover(self, script: Dict, style: str) -> Optional[np.ndarray]:
+        """Generate TTS voiceover from script, one cached synthesis per segment"""
         
+        texts = [segment['text'] for segment in script['segments']]
         try:
-            # Generate TTS
-            tts = gTTS(text=clean_text, lang='en', slow=False)
-            audio_path = f"{self.temp_dir}/voiceover_{int(time.time())}.mp3"
-            tts.save(audio_path)
-            
-            print(f"Generated voiceover: {len(clean_text)} characters")
-            return audio_path
+            pcm = await self.tts.synthesize(texts, language='en')
+            if pcm is None:
+                return None
+            print(f"Generated voiceover: {len(texts)} segments, {len(pcm) / SAMPLE_RATE:.1f}s "
+                  f"({self.tts.hits} cached / {self.tts.misses} synthesized so far)")
+            return pcm
             
         except Exception as e:
             print(f"TTS failed: {e}")
             return None
     
-    async def _generate_background_music(self, style: str, duration: int) -> str:
+    def _generate_background_music(self, style: str, duration: int) -> np.ndarray:
         """Generate background music based on style"""
-        import wave
-        
-        sample_rate = 44100
-        samples = int(duration * sample_rate)
-        
-        # Style-specific music characteristics
-        if style == 'fitness':
-            # High-energy workout music
-            audio = self._create_workout_beat(samples, sample_rate)
-        elif style == 'finance':
-            # Professional ambient music
-            audio = self._create_ambient_music(samples, sample_rate)
-        elif style == 'trendy':
-            # Upbeat electronic-style music
-            audio = self._create_electronic_beat(samples, sample_rate)
-        else:
-            # Default chill music
-            audio = self._create_chill_music(samples, sample_rate)
-        
-        # Save as temporary audio file
-        timestamp = int(time.time())
-        audio_path = f"{self.temp_dir}/music_{timestamp}.wav"
-        
-        # Convert to 16-bit PCM and save
-        audio_16bit = (audio * 32767).astype(np.int16)
-        
-        with wave.open(audio_path, 'w') as wav_file:
-            wav_file.setnchannels(1)  # Mono
-            wav_file.setsampwidth(2)  # 16-bit
-            wav_file.setframerate(sample_rate)
-            wav_file.writeframes(audio_16bit.tobytes())
-        
-        print(f"Generated background music: {audio_path}")
-        return audio_path
-    
-    def _create_electronic_beat(self, samples: int, sample_rate: int) -> np.ndarray:
-        """Create upbeat electronic music"""
-        audio = np.zeros(samples)
-        
-        # Create kick drum pattern
-        kick_interval = sample_rate // 2  # 120 BPM
-        for i in range(0, samples, kick_interval):
-            if i + 1000 < samples:
-                kick_sound = np.sin(2 * np.pi * 60 * np.arange(1000) / sample_rate)
-                kick_sound *= np.exp(-np.arange(1000) / 300)
-                audio[i:i+1000] += kick_sound * 0.4
-        
-        # Add synth melody
-        melody_freqs = [440, 523, 659, 784]  # A, C, E, G
-        for i, freq in enumerate(melody_freqs):
-            start = i * samples // 4
-            end = (i + 1) * samples // 4
-            if end <= samples:
-                melody = np.sin(2 * np.pi * freq * np.arange(end - start) / sample_rate)
-                audio[start:end] += melody * 0.2
-        
-        return np.clip(audio, -1, 1)
-    
-    def _create_ambient_music(self, samples: int, sample_rate: int) -> np.ndarray:
-        """Create professional ambient music"""
-        audio = np.zeros(samples)
-        
-        # Create ambient pad with multiple harmonics
-        base_freq = 220  # A3
-        for harmonic in [1, 0.5, 0.25]:
-            freq = base_freq * harmonic
-            wave = np.sin(2 * np.pi * freq * np.arange(samples) / sample_rate)
-            # Add gentle modulation
-            modulation = 1 + 0.1 * np.sin(2 * np.pi * 0.3 * np.arange(samples) / sample_rate)
-            audio += wave * modulation * 0.15
-        
-        # Add gentle fade in/out
-        fade_samples = sample_rate
-        audio[:fade_samples] *= np.linspace(0, 1, fade_samples)
-        audio[-fade_samples:] *= np.linspace(1, 0, fade_samples)
-        
-        return np.clip(audio, -1, 1)
-    
-    def _create_workout_beat(self, samples: int, sample_rate: int) -> np.ndarray:
-        """Create high-energy workout music"""
-        audio = np.zeros(samples)
-        
-        # Strong kick pattern
-        kick_interval = sample_rate // 3  # 180 BPM - high energy
-        for i in range(0, samples, kick_interval):
-            if i + 800 < samples:
-                kick_sound = np.sin(2 * np.pi * 50 * np.arange(800) / sample_rate)
-                kick_sound *= np.exp(-np.arange(800) / 200)
-                audio[i:i+800] += kick_sound * 0.5
-        
-        # Add driving synth line
-        synth_freq = 440
-        synth_wave = np.sin(2 * np.pi * synth_freq * np.arange(samples) / sample_rate)
-        filter_sweep = np.linspace(0.2, 0.5, samples)
-        audio += synth_wave * filter_sweep * 0.3
-        
-        return np.clip(audio, -1, 1)
+        music = style_music_pcm(style, duration)
+        print(f"Generated background music: {len(music) / SAMPLE_RATE:.1f}s of {stem_for_style(style)}")
+        return music
     
-    def _create_chill_music(self, samples: int, sample_rate: int) -> np.ndarray:
-        """Create relaxed chill music"""
-        audio = np.zeros(samples)
-        
-        # Create soft chord progression
-        chord_freqs = [196, 294, 370, 440]  # G major chord
-        for i, freq in enumerate(chord_freqs):
-            wave = np.sin(2 * np.pi * freq * np.arange(samples) / sample_rate)
-            # Add harmonics for warmth
-            wave += 0.3 * np.sin(2 * np.pi * freq * 2 * np.arange(samples) / sample_rate)
-            audio += wave * (0.15 - i * 0.02)
-        
-        return np.clip(audio, -1, 1)
-    
-    async def _create_visual_content(self, script: Dict, style: str, duration: int) -> List:
+    def _create_visual_content(
+        self, script: Dict, style: str, duration: int, size: Tuple[int, int] = REFERENCE_SIZE,
+        fps: Optional[float] = None
+    ) -> List:
         """Create visual content based on script"""
         
         clips = []
@@ -523,183 +512,122 @@ class AIContentGenerator:
             segment_duration = segment['duration']
             
             if segment['type'] == 'fact':
-                clip = self._create_enhanced_visual(segment['text'], segment.get('data'), colors, segment_duration)
+                clip = self._create_enhanced_visual(segment['text'], segment.get('data'), colors, segment_duration, size, fps)
             elif segment['type'] == 'conclusion':
-                clip = self._create_enhanced_visual(segment['text'], segment.get('data'), colors, segment_duration)
+                clip = self._create_enhanced_visual(segment['text'], segment.get('data'), colors, segment_duration, size, fps)
             else:
-                clip = self._create_enhanced_visual(segment['text'], segment.get('data'), colors, segment_duration)
+                clip = self._create_enhanced_visual(segment['text'], segment.get('data'), colors, segment_duration, size, fps)
             
             clips.append(clip)
             current_time += segment_duration
         
         return clips
     
-    def _create_hook_visual(self, text: str, colors: tuple, duration: float) -> mp.VideoClip:
+    def _create_hook_visual(
+        self, text: str, colors: tuple, duration: float, size: Tuple[int, int] = REFERENCE_SIZE
+    ) -> mp.VideoClip:
         """Create simple but reliable hook visual"""
         
+        width, height = size
+        scale = width / REFERENCE_WIDTH
+        background = get_background(colors, width, height)
+        
+        font = get_font(int(70 * scale))
+        shadow = max(1, int(3 * scale))
+        
+        # Word wrap and rasterize the text once; frames only move the sprites
+        lines = wrap_words(text, 12)
+        line_sprites = [
+            (text_sprite(line, font, 'white', shadow_fill='black', shadow_offset=shadow),
+             max(int(10 * scale), (width - text_width(line, font)) // 2))
+            for line in lines
+        ]
+        
         def make_frame(t):
-            width, height = 1080, 1920
-            img = Image.new('RGB', (width, height), colors[0])
-            draw = ImageDraw.Draw(img)
-            
             # Simple gradient background
-            for y in range(height):
-                ratio = y / height
-                r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
-                g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
-                b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-            
-            # Simple text
-            try:
-                font = ImageFont.truetype("arial.ttf", 70)
-            except:
-                font = ImageFont.load_default()
-            
-            # Word wrap text
-            words = text.split()
-            lines = []
-            current_line = []
-            for word in words:
-                current_line.append(word)
-                if len(' '.join(current_line)) > 12:
-                    lines.append(' '.join(current_line[:-1]))
-                    current_line = [word]
-            if current_line:
-                lines.append(' '.join(current_line))
+            frame = background.frame(t)
             
             # Simple bounce animation
-            bounce = int(20 * np.sin(t * 4))
+            bounce = int(20 * scale * np.sin(t * 4))
             
-            y_offset = height // 2 - (len(lines) * 40)
-            for line in lines:
-                if line.strip():
-                    bbox = draw.textbbox((0, 0), line, font=font)
-                    text_width = bbox[2] - bbox[0]
-                    x = max(10, (width - text_width) // 2)
-                    
-                    # Shadow
-                    draw.text((x+3, y_offset+bounce+3), line, font=font, fill='black')
-                    # Main text
-                    draw.text((x, y_offset+bounce), line, font=font, fill='white')
-                    
-                y_offset += 80
+            y_offset = height // 2 - int(len(lines) * 40 * scale)
+            for sprite, x in line_sprites:
+                composite(frame, sprite, x, y_offset + bounce)
+                y_offset += int(80 * scale)
             
-            return np.array(img)
+            return frame
         
         return mp.VideoClip(make_frame, duration=duration)
     
-    def _create_animated_fact_visual(self, text: str, data: Dict, colors: tuple, duration: float) -> mp.VideoClip:
+    def _create_animated_fact_visual(
+        self, text: str, data: Dict, colors: tuple, duration: float, size: Tuple[int, int] = REFERENCE_SIZE,
+        fps: Optional[float] = None
+    ) -> mp.VideoClip:
         """Create fact card with real visual animations"""
         
+        width, height = size
+        scale = width / REFERENCE_WIDTH
+        # The wave phase advances per output row, so keep its period in layout units
+        background = get_background(colors, width, height, wave_amplitude=0.1, wave_speed=2,
+                                    wave_frequency=0.01 / scale)
+        title_font = get_font(int(50 * scale))
+        text_font = get_font(int(40 * scale))
+        typewriter = TypewriterText(text, text_font, 25, 'white', max_lines=4)
+        
+        def shape_motion(t, i):
+            # Moving geometric shapes on a wobbling orbit
+            angle = np.radians((t * 50 + i * 45) % 360)
+            radius = (200 + 50 * np.sin(t * 3 + i)) * scale
+            x = width // 2 + radius * np.cos(angle)
+            y = height // 2 + radius * np.sin(angle)
+            visible = (0 <= x) & (x < width) & (0 <= y) & (y < height)
+            return x, y, ((15 + 5 * np.sin(t * 4 + i)) * scale).astype(int), visible
+        
+        def particle_motion(t, i):
+            # Floating particles
+            px = ((i * 137 + t * 100) * scale) % width
+            py = ((i * 73 + t * 80) * scale) % height
+            return px, py, ((3 + 2 * np.sin(t * 5 + i)) * scale).astype(int), None
+        
+        decorations = ParticleSystem([
+            ParticleLayer(shape_motion, (['circle', 'square', 'triangle'] * 3)[:8],
+                          (['white', 'yellow', 'cyan'] * 3)[:8]),
+            ParticleLayer(particle_motion, ['circle'] * 20, ['white'] * 20),
+        ], fps, duration)
+        
         def make_frame(t):
-            width, height = 1080, 1920
-            img = Image.new('RGB', (width, height), colors[0])
+            # Animated gradient with wave effects, shapes and particles
+            frame = background.frame(t)
+            decorations.draw(frame, t)
+            img = Image.fromarray(frame)
             draw = ImageDraw.Draw(img)
             
-            # Animated gradient with wave effects
-            for y in range(height):
-                ratio = y / height
-                wave = 0.1 * np.sin(t * 2 + y * 0.01)
-                ratio = max(0, min(1, ratio + wave))
-                r = int(colors[0][0] * (1-ratio) + colors[1][0] * ratio)
-                g = int(colors[0][1] * (1-ratio) + colors[1][1] * ratio)
-                b = int(colors[0][2] * (1-ratio) + colors[1][2] * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-            
-            # Moving geometric shapes
-            num_shapes = 8
-            for i in range(num_shapes):
-                angle = (t * 50 + i * 45) % 360
-                radius = 200 + 50 * np.sin(t * 3 + i)
-                x = width // 2 + int(radius * np.cos(np.radians(angle)))
-                y = height // 2 + int(radius * np.sin(np.radians(angle)))
-                
-                if 0 <= x < width and 0 <= y < height:
-                    size = int(15 + 5 * np.sin(t * 4 + i))
-                    alpha = int(100 + 50 * np.sin(t * 2 + i))
-                    
-                    if i % 3 == 0:
-                        # Circles
-                        draw.ellipse([x-size, y-size, x+size, y+size], 
-                                   fill=(255, 255, 255, alpha))
-                    elif i % 3 == 1:
-                        # Squares
-                        draw.rectangle([x-size, y-size, x+size, y+size], 
-                                     fill=(255, 255, 0, alpha))
-                    else:
-                        # Triangles
-                        draw.polygon([(x, y-size), (x-size, y+size), (x+size, y+size)], 
-                                   fill=(0, 255, 255, alpha))
-            
-            # Floating particles
-            particle_count = 20
-            for i in range(particle_count):
-                px = int((i * 137 + t * 100) % width)
-                py = int((i * 73 + t * 80) % height)
-                particle_size = int(3 + 2 * np.sin(t * 5 + i))
-                draw.ellipse([px-particle_size, py-particle_size, 
-                            px+particle_size, py+particle_size], fill='white')
-            
             # Animated progress bars (visual interest)
             bar_count = 5
+            bar_left = width - int(250 * scale)
             for i in range(bar_count):
-                bar_y = 100 + i * 50
+                bar_y = int((100 + i * 50) * scale)
                 bar_progress = (t + i * 0.5) % 2  # 2-second cycle
-                bar_width = int(200 * min(1, bar_progress))
+                bar_width = int(200 * scale * min(1, bar_progress))
                 
                 # Background bar
-                draw.rectangle([width - 250, bar_y, width - 50, bar_y + 20], 
+                draw.rectangle([bar_left, bar_y, width - int(50 * scale), bar_y + int(20 * scale)], 
                              fill=(50, 50, 50))
                 # Animated bar
-                draw.rectangle([width - 250, bar_y, width - 250 + bar_width, bar_y + 20], 
+                draw.rectangle([bar_left, bar_y, bar_left + bar_width, bar_y + int(20 * scale)], 
                              fill=colors[1])
             
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 50)
-                text_font = ImageFont.truetype("arial.ttf", 40)
-            except:
-                title_font = ImageFont.load_default()
-                text_font = ImageFont.load_default()
-            
             # Animated title with pulse
             title_scale = 1 + 0.1 * np.sin(t * 6)
             title_bounce = int(10 * np.sin(t * 4))
-            draw.text((50, 200 + title_bounce), "KEY INSIGHT", font=title_font, fill='yellow')
+            draw.text((int(50 * scale), int((200 + title_bounce) * scale)), "KEY INSIGHT", font=title_font, fill='yellow')
             
-            # Fact text with typewriter effect
-            words = text.split()
-            lines = []
-            current_line = []
-            for word in words:
-                current_line.append(word)
-                if len(' '.join(current_line)) > 25:
-                    lines.append(' '.join(current_line[:-1]))
-                    current_line = [word]
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            # Progressive text reveal
+            # Progressive text reveal; lines are blitted once the drawing is done
             chars_revealed = int(len(text) * min(1, t / 2))
-            revealed_text = text[:chars_revealed]
-            
-            # Rebuild lines with revealed text
-            revealed_words = revealed_text.split()
-            revealed_lines = []
-            current_line = []
-            for word in revealed_words:
-                current_line.append(word)
-                if len(' '.join(current_line)) > 25:
-                    revealed_lines.append(' '.join(current_line[:-1]))
-                    current_line = [word]
-            if current_line:
-                revealed_lines.append(' '.join(current_line))
             
-            y_pos = 300
-            for line in revealed_lines[:4]:
-                line_bounce = int(5 * np.sin(t * 3 + y_pos * 0.01))
-                draw.text((50, y_pos + line_bounce), line, font=text_font, fill='white')
-                y_pos += 50
+            # Layout runs in reference units and is scaled when drawn
+            left = int(50 * scale)
+            y_pos = 300 + 50 * typewriter.visible_lines(chars_revealed)
             
             # Animated data visualization
             if data:
@@ -708,328 +636,176 @@ class AIContentGenerator:
                 # Animated chart
                 chart_progress = min(1, (t - 1) / 2)  # Start after 1 second
                 chart_width = int(300 * chart_progress)
+                chart_top, chart_bottom = int((data_y + 50) * scale), int((data_y + 100) * scale)
                 
                 # Chart background
-                draw.rectangle([50, data_y + 50, 350, data_y + 100], fill=(30, 30, 30))
+                draw.rectangle([left, chart_top, int(350 * scale), chart_bottom], fill=(30, 30, 30))
                 # Animated chart fill
-                draw.rectangle([50, data_y + 50, 50 + chart_width, data_y + 100], fill='lime')
+                draw.rectangle([left, chart_top, int((50 + chart_width) * scale), chart_bottom], fill='lime')
                 
                 # Data text with glow
                 data_text = f"{data['label']}: {data['value']}"
-                draw.text((52, data_y + 2), data_text, font=title_font, fill='black')  # Shadow
-                draw.text((50, data_y), data_text, font=title_font, fill='lime')
+                shadow = max(1, int(2 * scale))
+                draw.text((left + shadow, int(data_y * scale) + shadow), data_text, font=title_font, fill='black')  # Shadow
+                draw.text((left, int(data_y * scale)), data_text, font=title_font, fill='lime')
                 
                 if 'change' in data:
                     change_pulse = 1 + 0.2 * np.sin(t * 8)
                     change_color = 'lime' if '+' in data['change'] else 'red'
-                    draw.text((50, data_y + 160), f"Change: {data['change']}", 
+                    draw.text((left, int((data_y + 160) * scale)), f"Change: {data['change']}", 
                              font=text_font, fill=change_color)
             
-            return np.array(img)
+            frame = np.array(img)
+            line_y = 300
+            for _, sprite, max_width in typewriter.spans(chars_revealed):
+                line_bounce = int(5 * np.sin(t * 3 + line_y * 0.01))
+                composite(frame, sprite, left, int((line_y + line_bounce) * scale), max_width)
+                line_y += 50
+            
+            return frame
         
         return mp.VideoClip(make_frame, duration=duration)
     
-    def _create_animated_conclusion_visual(self, text: str, colors: tuple, duration: float) -> mp.VideoClip:
+    def _create_animated_conclusion_visual(
+        self, text: str, colors: tuple, duration: float, size: Tuple[int, int] = REFERENCE_SIZE,
+        fps: Optional[float] = None
+    ) -> mp.VideoClip:
         """Create conclusion visual with spectacular animations"""
         
+        width, height = size
+        scale = width / REFERENCE_WIDTH
+        font = get_font(int(45 * scale))
+        cta_font = get_font(int(65 * scale))
+        margin = int(10 * scale)
+        
+        # Text lines never change, so wrap and rasterize them once
+        shadow = max(1, int(2 * scale))
+        lines = wrap_words(text, 18)
+        line_sprites = [
+            (text_sprite(line, font, 'white', shadow_fill='black', shadow_offset=shadow),
+             max(margin, (width - text_width(line, font)) // 2))
+            for line in lines
+        ]
+        
+        # The CTA changes color every frame, so it is rasterized in white and tinted
+        cta = "LIKE & FOLLOW FOR MORE!"
+        cta_width = text_width(cta, cta_font)
+        cta_sprite = text_sprite(cta, cta_font, 'white')
+        cta_shadow = text_sprite(cta, cta_font, 'black')
+        cta_shadow_offset = max(1, int(3 * scale))
+        center_x, center_y = width // 2, height // 2
+        
+        def cta_position(t):
+            # Bouncing, pulsing CTA; works on scalars and arrays of times
+            cta_bounce = np.trunc(30 * scale * np.sin(t * 6)).astype(int)
+            cta_scale = 1 + 0.2 * np.sin(t * 8)
+            x = np.maximum(margin, (width - np.trunc(cta_width * cta_scale).astype(int)) // 2)
+            return x, height - int(250 * scale) + cta_bounce
+        
+        def in_frame(x, y):
+            return (0 <= x) & (x < width) & (0 <= y) & (y < height)
+        
+        def spiral_motion(t, i):
+            # Animated spiral background: 3 arms of 24 dots
+            spiral, angle_step = i // 24, (i % 24) * 15
+            angle = np.radians(angle_step + t * 100 + spiral * 120)
+            radius = (100 + spiral * 80 + 30 * np.sin(t * 2 + spiral)) * scale
+            x = center_x + radius * np.cos(angle)
+            y = center_y + radius * np.sin(angle)
+            return x, y, ((8 + 4 * np.sin(t * 3 + angle_step)) * scale).astype(int), in_frame(x, y)
+        
+        def ray_motion(t, i):
+            # Animated radiating lines
+            angle = np.radians(i * 30 + t * 50)
+            length = (200 + 50 * np.sin(t * 2 + i)) * scale
+            return (center_x + 50 * scale * np.cos(angle), center_y + 50 * scale * np.sin(angle),
+                    center_x + length * np.cos(angle), center_y + length * np.sin(angle),
+                    np.maximum(1, ((3 + 2 * np.sin(t * 4 + i)) * scale).astype(int)))
+        
+        def icon_motion(t, i):
+            # Floating icons/symbols
+            angle = np.radians((t * 80 + i * 24) % 360)
+            radius = (300 + 100 * np.sin(t * 1.5 + i)) * scale
+            x = center_x + radius * np.cos(angle)
+            y = center_y + radius * np.sin(angle)
+            return x, y, ((12 + 6 * np.sin(t * 5 + i)) * scale).astype(int), in_frame(x, y)
+        
+        def sparkle_motion(t, i):
+            # Sparkles around the CTA
+            cta_x, cta_y = cta_position(t)
+            angle = np.radians((t * 300 + i * 45) % 360)
+            radius = (150 + 30 * np.sin(t * 4 + i)) * scale
+            x = cta_x + cta_width // 2 + radius * np.cos(angle)
+            y = cta_y + int(30 * scale) + radius * np.sin(angle)
+            return x, y, ((8 + 4 * np.sin(t * 10 + i)) * scale).astype(int), in_frame(x, y)
+        
+        background_row = np.tile(np.array(colors[1], dtype=np.uint8), (width, 1))
+        
+        decorations = ParticleSystem([
+            ParticleLayer(spiral_motion, ['circle'] * 72, [colors[0]] * 72),
+            LineLayer(ray_motion, 12, 'white'),
+            ParticleLayer(icon_motion, ['heart', 'star', 'thumb', 'bolt'] * 4,
+                          ['red', 'yellow', 'lime', 'cyan'] * 4),
+            ParticleLayer(sparkle_motion, ['diamond'] * 8, ['yellow'] * 8),
+        ], fps, duration)
+        
         def make_frame(t):
-            width, height = 1080, 1920
-            img = Image.new('RGB', (width, height), colors[1])
-            draw = ImageDraw.Draw(img)
+            # Broadcasting a whole row is much faster than a single pixel
+            frame = np.empty((height, width, 3), dtype=np.uint8)
+            frame[...] = background_row
             
-            # Animated spiral background
-            center_x, center_y = width // 2, height // 2
-            for spiral in range(3):
-                for angle_step in range(0, 360, 15):
-                    angle = angle_step + t * 100 + spiral * 120
-                    radius = 100 + spiral * 80 + 30 * np.sin(t * 2 + spiral)
-                    x = center_x + int(radius * np.cos(np.radians(angle)))
-                    y = center_y + int(radius * np.sin(np.radians(angle)))
-                    
-                    if 0 <= x < width and 0 <= y < height:
-                        size = int(8 + 4 * np.sin(t * 3 + angle_step))
-                        alpha = int(150 + 50 * np.sin(t + spiral))
-                        draw.ellipse([x-size, y-size, x+size, y+size], 
-                                   fill=colors[0])
-            
-            # Animated radiating lines
-            line_count = 12
-            for i in range(line_count):
-                angle = i * 30 + t * 50
-                length = 200 + 50 * np.sin(t * 2 + i)
-                
-                x1 = center_x + int(50 * np.cos(np.radians(angle)))
-                y1 = center_y + int(50 * np.sin(np.radians(angle)))
-                x2 = center_x + int(length * np.cos(np.radians(angle)))
-                y2 = center_y + int(length * np.sin(np.radians(angle)))
-                
-                width_val = int(3 + 2 * np.sin(t * 4 + i))
-                draw.line([(x1, y1), (x2, y2)], fill='white', width=width_val)
+            # Spiral dots and radiating lines
+            decorations.draw(frame, t, layers=(0, 1))
             
             # Pulsating border with layers
             for layer in range(4):
-                border_pulse = int(15 + layer * 8 + 15 * np.sin(t * 4 + layer))
-                border_alpha = int(100 + 50 * np.sin(t * 3 + layer))
-                border_color = colors[0] if layer % 2 == 0 else 'white'
-                
-                draw.rectangle([border_pulse, border_pulse, width-border_pulse, height-border_pulse], 
-                              outline=border_color, width=3 + layer)
-            
-            # Floating icons/symbols
-            icon_count = 15
-            for i in range(icon_count):
-                icon_angle = (t * 80 + i * 24) % 360
-                icon_radius = 300 + 100 * np.sin(t * 1.5 + i)
-                icon_x = center_x + int(icon_radius * np.cos(np.radians(icon_angle)))
-                icon_y = center_y + int(icon_radius * np.sin(np.radians(icon_angle)))
-                
-                if 0 <= icon_x < width and 0 <= icon_y < height:
-                    icon_size = int(12 + 6 * np.sin(t * 5 + i))
-                    
-                    if i % 4 == 0:
-                        # Hearts
-                        draw.ellipse([icon_x-icon_size//2, icon_y-icon_size//2, 
-                                    icon_x+icon_size//2, icon_y], fill='red')
-                        draw.ellipse([icon_x, icon_y-icon_size//2, 
-                                    icon_x+icon_size, icon_y], fill='red')
-                        draw.polygon([(icon_x+icon_size//4, icon_y), 
-                                    (icon_x-icon_size//2, icon_y+icon_size), 
-                                    (icon_x+icon_size, icon_y+icon_size)], fill='red')
-                    elif i % 4 == 1:
-                        # Stars
-                        points = []
-                        for p in range(10):
-                            a = p * 36
-                            r = icon_size if p % 2 == 0 else icon_size // 2
-                            px = icon_x + int(r * np.cos(np.radians(a)))
-                            py = icon_y + int(r * np.sin(np.radians(a)))
-                            points.append((px, py))
-                        draw.polygon(points, fill='yellow')
-                    elif i % 4 == 2:
-                        # Thumbs up (simplified)
-                        draw.rectangle([icon_x-icon_size//3, icon_y, 
-                                      icon_x+icon_size//3, icon_y+icon_size], fill='lime')
-                        draw.ellipse([icon_x-icon_size//2, icon_y-icon_size//2, 
-                                    icon_x+icon_size//2, icon_y+icon_size//2], fill='lime')
-                    else:
-                        # Lightning bolt
-                        draw.polygon([(icon_x, icon_y-icon_size), 
-                                    (icon_x+icon_size//2, icon_y), 
-                                    (icon_x-icon_size//4, icon_y), 
-                                    (icon_x, icon_y+icon_size)], fill='cyan')
-            
-            try:
-                font = ImageFont.truetype("arial.ttf", 45)
-                cta_font = ImageFont.truetype("arial.ttf", 65)
-            except:
-                font = ImageFont.load_default()
-                cta_font = ImageFont.load_default()
-            
-            # Animated text with effects
-            words = text.split()
-            lines = []
-            current_line = []
-            for word in words:
-                current_line.append(word)
-                if len(' '.join(current_line)) > 18:
-                    lines.append(' '.join(current_line[:-1]))
-                    current_line = [word]
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            y_start = height // 2 - (len(lines) * 35)
-            for i, line in enumerate(lines):
-                # Wave effect for each line
-                wave_offset = int(20 * np.sin(t * 4 + i * 0.8))
-                
-                bbox = draw.textbbox((0, 0), line, font=font)
-                text_width = bbox[2] - bbox[0]
-                x = max(10, (width - text_width) // 2)
-                
-                # Simple shadow for text
-                draw.text((x + 2, y_start + wave_offset + 2), line, font=font, fill='black')
-                draw.text((x, y_start + wave_offset), line, font=font, fill='white')
-                
-                y_start += 70
-            
-            # Spectacular animated CTA
-            cta = "LIKE & FOLLOW FOR MORE!"
-            
-            # Rainbow effect
+                inset = int((15 + layer * 8 + 15 * np.sin(t * 4 + layer)) * scale)
+                border = max(1, int((3 + layer) * scale))
+                border_color = colors[0] if layer % 2 == 0 else (255, 255, 255)
+                box = frame[inset:height - inset + 1, inset:width - inset + 1]
+                box[:border] = box[-border:] = border_color
+                box[:, :border] = box[:, -border:] = border_color
+            
+            # Floating icons
+            decorations.draw(frame, t, layers=(2,))
+            
+            # Animated text with a wave effect for each line
+            y_start = height // 2 - int(len(lines) * 35 * scale)
+            for i, (sprite, x) in enumerate(line_sprites):
+                wave_offset = int(20 * scale * np.sin(t * 4 + i * 0.8))
+                composite(frame, sprite, x, y_start + wave_offset)
+                y_start += int(70 * scale)
+            
+            # Spectacular animated CTA with a rainbow effect
             hue = (t * 200) % 360
             r = int(255 * (1 + np.sin(np.radians(hue))) / 2)
             g = int(255 * (1 + np.sin(np.radians(hue + 120))) / 2)
             b = int(255 * (1 + np.sin(np.radians(hue + 240))) / 2)
-            rainbow_color = (r, g, b)
             
-            # Bouncing CTA
-            cta_bounce = int(30 * np.sin(t * 6))
-            cta_scale = 1 + 0.2 * np.sin(t * 8)
-            
-            bbox = draw.textbbox((0, 0), cta, font=cta_font)
-            text_width = bbox[2] - bbox[0]
-            x = max(10, (width - int(text_width * cta_scale)) // 2)
-            cta_y = height - 250 + cta_bounce
-            
-            # Simple shadow effect for CTA
-            draw.text((x + 3, cta_y + 3), cta, font=cta_font, fill='black')  # Shadow
-            draw.text((x, cta_y), cta, font=cta_font, fill=rainbow_color)    # Main text
+            x, cta_y = cta_position(t)
+            composite(frame, cta_shadow, int(x) + cta_shadow_offset, int(cta_y) + cta_shadow_offset)
+            composite(frame, tint(cta_sprite, (r, g, b)), int(x), int(cta_y))
             
             # Sparkles around CTA
-            sparkle_count = 8
-            for i in range(sparkle_count):
-                sparkle_angle = (t * 300 + i * 45) % 360
-                sparkle_radius = 150 + 30 * np.sin(t * 4 + i)
-                sx = x + text_width // 2 + int(sparkle_radius * np.cos(np.radians(sparkle_angle)))
-                sy = cta_y + 30 + int(sparkle_radius * np.sin(np.radians(sparkle_angle)))
-                
-                if 0 <= sx < width and 0 <= sy < height:
-                    sparkle_size = int(8 + 4 * np.sin(t * 10 + i))
-                    # 4-pointed star
-                    draw.polygon([(sx, sy-sparkle_size), (sx+sparkle_size//2, sy), 
-                                (sx, sy+sparkle_size), (sx-sparkle_size//2, sy)], 
-                               fill='yellow')
+            decorations.draw(frame, t, layers=(3,))
             
-            return np.array(img)
+            return frame
         
         return mp.VideoClip(make_frame, duration=duration)
     
-    def _create_enhanced_visual(self, text: str, data: Dict, colors: tuple, duration: float) -> mp.VideoClip:
+    def _create_enhanced_visual(
+        self, text: str, data: Dict, colors: tuple, duration: float, size: Tuple[int, int] = REFERENCE_SIZE,
+        fps: Optional[float] = None
+    ) -> mp.VideoClip:
         """Create enhanced visual with reliable animations"""
+        return mp.VideoClip(EnhancedCardRenderer(text, data, colors, size, duration, fps), duration=duration)
         
-        def make_frame(t):
-            width, height = 1080, 1920
-            img = Image.new('RGB', (width, height), colors[0])
-            draw = ImageDraw.Draw(img)
-            
-            # Animated gradient background
-            for y in range(height):
-                ratio = y / height
-                wave = 0.15 * np.sin(t * 2 + y * 0.005)  # Gentler wave
-                ratio = max(0, min(1, ratio + wave))
-                r = int(colors[0][0] * (1-ratio) + colors[1][0] * ratio)
-                g = int(colors[0][1] * (1-ratio) + colors[1][1] * ratio)
-                b = int(colors[0][2] * (1-ratio) + colors[1][2] * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-            
-            # Moving circles animation
-            circle_count = 6
-            for i in range(circle_count):
-                angle = (t * 30 + i * 60) % 360
-                radius = 250 + 50 * np.sin(t + i)
-                cx = width // 2 + int(radius * np.cos(np.radians(angle)))
-                cy = height // 2 + int(radius * np.sin(np.radians(angle)))
-                
-                if 50 <= cx <= width - 50 and 50 <= cy <= height - 50:
-                    circle_size = int(20 + 10 * np.sin(t * 3 + i))
-                    alpha = int(80 + 40 * np.sin(t * 2 + i))
-                    
-                    # Draw circles with different colors
-                    if i % 3 == 0:
-                        color = 'white'
-                    elif i % 3 == 1:
-                        color = 'yellow'
-                    else:
-                        color = 'cyan'
-                        
-                    draw.ellipse([cx-circle_size, cy-circle_size, 
-                                cx+circle_size, cy+circle_size], fill=color)
-            
-            # Floating particles
-            particle_count = 15
-            for i in range(particle_count):
-                px = int((i * 89 + t * 80) % width)
-                py = int((i * 113 + t * 60) % height)
-                particle_size = int(4 + 2 * np.sin(t * 4 + i))
-                
-                # Make sure particles are within bounds
-                if particle_size <= px <= width - particle_size and particle_size <= py <= height - particle_size:
-                    draw.ellipse([px-particle_size, py-particle_size, 
-                                px+particle_size, py+particle_size], fill='white')
-            
-            # Animated progress bars on the side
-            bar_count = 4
-            for i in range(bar_count):
-                bar_y = 200 + i * 80
-                bar_progress = (t * 0.8 + i * 0.5) % 3  # 3-second cycle
-                bar_width = int(150 * min(1, bar_progress))
-                
-                # Ensure bars are within bounds
-                bar_x = width - 200
-                if bar_x + bar_width <= width - 20:
-                    # Background bar
-                    draw.rectangle([bar_x, bar_y, bar_x + 150, bar_y + 15], fill=(40, 40, 40))
-                    # Animated bar
-                    if bar_width > 0:
-                        draw.rectangle([bar_x, bar_y, bar_x + bar_width, bar_y + 15], fill=colors[1])
-            
-            try:
-                title_font = ImageFont.truetype("arial.ttf", 55)
-                text_font = ImageFont.truetype("arial.ttf", 42)
-            except:
-                title_font = ImageFont.load_default()
-                text_font = ImageFont.load_default()
-            
-            # Animated title
-            title_bounce = int(15 * np.sin(t * 4))
-            draw.text((60, 180 + title_bounce), "KEY INSIGHT", font=title_font, fill='yellow')
-            
-            # Progressive text reveal
-            chars_per_second = 20
-            chars_revealed = int(chars_per_second * t)
-            revealed_text = text[:chars_revealed]
-            
-            # Word wrap revealed text
-            words = revealed_text.split()
-            lines = []
-            current_line = []
-            for word in words:
-                current_line.append(word)
-                if len(' '.join(current_line)) > 22:
-                    if len(current_line) > 1:
-                        lines.append(' '.join(current_line[:-1]))
-                        current_line = [word]
-                    else:
-                        lines.append(word)
-                        current_line = []
-            if current_line:
-                lines.append(' '.join(current_line))
-            
-            y_pos = 280
-            for line in lines[:4]:  # Max 4 lines
-                if line.strip():
-                    line_bounce = int(8 * np.sin(t * 3 + y_pos * 0.01))
-                    
-                    # Simple shadow
-                    draw.text((62, y_pos + line_bounce + 2), line, font=text_font, fill='black')
-                    draw.text((60, y_pos + line_bounce), line, font=text_font, fill='white')
-                    
-                y_pos += 60
-            
-            # Data visualization if available
-            if data:
-                data_y = y_pos + 80
-                data_text = f"{data['label']}: {data['value']}"
-                
-                # Ensure data text is within bounds
-                if data_y + 100 < height:
-                    # Simple shadow for data
-                    draw.text((62, data_y + 2), data_text, font=title_font, fill='black')
-                    draw.text((60, data_y), data_text, font=title_font, fill='lime')
-                    
-                    if 'change' in data:
-                        change_text = f"Change: {data['change']}"
-                        change_color = 'lime' if '+' in data['change'] else 'orange'
-                        draw.text((62, data_y + 62), change_text, font=text_font, fill='black')
-                        draw.text((60, data_y + 60), change_text, font=text_font, fill=change_color)
-            
-            return np.array(img)
-        
-        return mp.VideoClip(make_frame, duration=duration)
-        
-    def _create_default_visual(self, text: str, colors: tuple, duration: float) -> mp.VideoClip:
+    def _create_default_visual(
+        self, text: str, colors: tuple, duration: float, size: Tuple[int, int] = REFERENCE_SIZE,
+        fps: Optional[float] = None
+    ) -> mp.VideoClip:
         """Create default visual for any segment"""
-        return self._create_enhanced_visual(text, None, colors, duration)
+        return self._create_enhanced_visual(text, None, colors, duration, size, fps)
     
     def _get_style_colors(self, style: str) -> tuple:
         """Get color scheme for style"""
@@ -1043,79 +819,205 @@ class AIContentGenerator:
         }
         return color_schemes.get(style, color_schemes['trendy'])
     
-    async def _combine_content(self, visual_clips: List, voiceover_path: str, duration: int) -> mp.VideoClip:
-        """Combine visual clips with voiceover"""
+    async def _combine_content(
+        self, visual_clips: List, voiceover: Optional[np.ndarray], music: Optional[np.ndarray], duration: int
+    ) -> Optional[np.ndarray]:
+        """Soundtrack for the visual clips: the voiceover mixed over the music, or None"""
         
-        # Concatenate visual clips
-        if visual_clips:
-            video = mp.concatenate_videoclips(visual_clips)
-        else:
-            # Fallback single clip
-            video = self._create_fallback_clip(duration)
-        
-        # Add voiceover if available
-        if voiceover_path and os.path.exists(voiceover_path):
-            try:
-                audio = mp.AudioFileClip(voiceover_path)
-                # Trim or extend audio to match video duration
-                if audio.duration > duration:
-                    audio = audio.subclip(0, duration)
-                elif audio.duration < duration:
-                    # Add silence at the end
-                    silence_duration = duration - audio.duration
-                    silence = mp.AudioClip(lambda t: 0, duration=silence_duration)
-                    audio = mp.concatenate_audioclips([audio, silence])
-                
-                video = video.set_audio(audio)
-                print(f"Added voiceover audio ({audio.duration:.1f}s)")
-            except Exception as e:
-                print(f"Failed to add audio: {e}")
+        # The video is the clips back to back, or the fallback clip of the full duration
+        video_duration = sum(clip.duration for clip in visual_clips) if visual_clips else duration
         
-        return video
+        # Fit both tracks to the video and duck the music under speech
+        soundtrack = mix(voiceover, music, video_duration, SAMPLE_RATE)
+        if soundtrack is not None:
+            parts = [name for name, pcm in (('voiceover', voiceover), ('music', music)) if pcm is not None]
+            print(f"Added {' over '.join(parts)} ({video_duration:.1f}s)")
+        
+        return soundtrack
     
-    def _create_fallback_clip(self, duration: int) -> mp.VideoClip:
+    def _create_fallback_clip(self, duration: int, size: Tuple[int, int] = REFERENCE_SIZE) -> mp.VideoClip:
         """Create fallback visual when others fail"""
-        def make_frame(t):
-            width, height = 1080, 1920
-            frame = np.random.randint(50, 200, (height, width, 3), dtype=np.uint8)
-            return frame
-        
-        return mp.VideoClip(make_frame, duration=duration)
+        width, height = size
+        return mp.VideoClip(RandomNoiseBackground(width, height), duration=duration)
     
-    async def _create_fallback_reel(self, prompt: str, style: str, duration: int, output_path: str) -> str:
+    async def _create_fallback_reel(
+        self, prompt: str, style: str, duration: int, output_path: str, profile=None
+    ) -> str:
         """Create simple fallback reel if AI generation fails"""
         
+        profile = profile or get_profile()
+        width, height = profile.size
         colors = self._get_style_colors(style)
         
-        def make_frame(t):
-            width, height = 1080, 1920
-            img = Image.new('RGB', (width, height), colors[0])
-            draw = ImageDraw.Draw(img)
-            
-            # Simple gradient
-            for y in range(height):
-                ratio = y / height
-                r = int(colors[0][0] * (1-ratio) + colors[1][0] * ratio)
-                g = int(colors[0][1] * (1-ratio) + colors[1][1] * ratio)
-                b = int(colors[0][2] * (1-ratio) + colors[1][2] * ratio)
-                draw.line([(0, y), (width, y)], fill=(r, g, b))
-            
-            # Add prompt text
-            try:
-                font = ImageFont.truetype("arial.ttf", 60)
-            except:
-                font = ImageFont.load_default()
-            
-            # Center text
-            bbox = draw.textbbox((0, 0), prompt, font=font)
-            text_width = bbox[2] - bbox[0]
-            x = (width - text_width) // 2
-            y = height // 2
-            draw.text((x, y), prompt, font=font, fill='white')
-            
-            return np.array(img)
+        background = get_background(colors, width, height)
+        
+        # Centered prompt text, rasterized once
+        font = get_font(int(60 * profile.scale))
+        prompt_sprite = text_sprite(prompt, font, 'white')
+        x = (width - text_width(prompt, font)) // 2
+        y = height // 2
+        
+        # Simple gradient
+        frame = background.frame(0)
+        composite(frame, prompt_sprite, x, y)
         
-        video = mp.VideoClip(make_frame, duration=duration)
-        video.write_videofile(output_path, fps=15, verbose=False, logger=None)
+        # The fallback is a static card, so it never needs more than 15 fps
+        # and is exported as a single held frame
+        video = mp.ImageClip(frame, duration=duration)
+        write_clip(video, output_path, fps=min(15, profile.fps),
+                   settings=profile.encoder_settings(self.encoder_settings))
         
-        return output_path
\ No newline at end of file
+        return output_path
+
+
+class EnhancedCardRenderer:
+    """Picklable make_frame for the enhanced fact/conclusion card.
+    
+    Only the constructor arguments are pickled; fonts and the cached static
+    layers are built lazily in whichever process renders the first frame, so
+    the renderer can be shipped to parallel render workers. Layout constants
+    are in 1080x1920 reference units and scaled to the output size.
+    """
+    
+    bar_count = 4
+    
+    def __init__(
+        self,
+        text: str,
+        data: Optional[Dict],
+        colors: tuple,
+        size: Tuple[int, int] = REFERENCE_SIZE,
+        duration: Optional[float] = None,
+        fps: Optional[float] = None
+    ):
+        self.text = text
+        self.data = data
+        self.colors = colors
+        self.width, self.height = size
+        self.scale = self.width / REFERENCE_WIDTH
+        # With both known, decoration motion is precomputed for the whole segment
+        self.duration = duration
+        self.fps = fps
+        self._prepared = False
+    
+    def __getstate__(self):
+        state = {key: self.__dict__[key]
+                 for key in ('text', 'data', 'colors', 'width', 'height', 'scale', 'duration', 'fps')}
+        state['_prepared'] = False
+        return state
+    
+    def _px(self, value: float) -> int:
+        """Convert reference layout units to output pixels"""
+        return int(value * self.scale)
+    
+    def _prepare(self):
+        width, height = self.width, self.height
+        px = self._px
+        data = self.data
+        # Gentler wave than the fact card; the phase advances per output row
+        self.background = get_background(self.colors, width, height, wave_amplitude=0.15, wave_speed=2,
+                                         wave_frequency=0.005 / self.scale)
+        
+        title_font = get_font(px(55))
+        text_font = get_font(px(42))
+        self.text_font = text_font
+        self.shadow_offset = max(1, px(2))
+        
+        # Static layers are rasterized once per segment; make_frame only
+        # positions them and fills in the animated elements
+        self.bar_x = width - px(200)
+        self.bar_rows = [(px(200 + i * 80), px(200 + i * 80) + px(16)) for i in range(self.bar_count)]
+        
+        def draw_bar_backgrounds(draw):
+            for top, bottom in self.bar_rows:
+                draw.rectangle([self.bar_x, top, self.bar_x + px(150), bottom - 1], fill=(40, 40, 40))
+        
+        self.bar_plate = rasterize(width, height, draw_bar_backgrounds)
+        self.decorations = ParticleSystem([
+            ParticleLayer(self._circle_motion, ['circle'] * 6, ['white', 'yellow', 'cyan'] * 2),
+            ParticleLayer(self._particle_motion, ['circle'] * 15, ['white'] * 15),
+        ], self.fps, self.duration)
+        self.title_sprite = text_sprite("KEY INSIGHT", title_font, 'yellow')
+        
+        self.data_sprite = self.change_sprite = None
+        if data:
+            self.data_sprite = text_sprite(f"{data['label']}: {data['value']}", title_font, 'lime',
+                                           shadow_fill='black', shadow_offset=self.shadow_offset)
+            if 'change' in data:
+                change_color = 'lime' if '+' in data['change'] else 'orange'
+                self.change_sprite = text_sprite(f"Change: {data['change']}", text_font, change_color,
+                                                 shadow_fill='black', shadow_offset=self.shadow_offset)
+        
+        # Typewriter text is laid out once for the full text and revealed by clipping
+        self.typewriter = TypewriterText(self.text, text_font, 22, 'white', shadow_fill='black',
+                                         shadow_offset=self.shadow_offset, max_lines=4)
+        self._prepared = True
+    
+    def _circle_motion(self, t: np.ndarray, i: np.ndarray):
+        """Moving circles on a wobbling orbit, kept 50 units inside the frame"""
+        width, height = REFERENCE_SIZE
+        angle = np.radians((t * 30 + i * 60) % 360)
+        radius = 250 + 50 * np.sin(t + i)
+        cx = width // 2 + radius * np.cos(angle)
+        cy = height // 2 + radius * np.sin(angle)
+        visible = (50 <= cx) & (cx <= width - 50) & (50 <= cy) & (cy <= height - 50)
+        size = (20 + 10 * np.sin(t * 3 + i)).astype(int)
+        return cx * self.scale, cy * self.scale, (size * self.scale).astype(int), visible
+    
+    def _particle_motion(self, t: np.ndarray, i: np.ndarray):
+        """Floating particles drifting diagonally and wrapping at the edges"""
+        width, height = REFERENCE_SIZE
+        px = (i * 89 + t * 80) % width
+        py = (i * 113 + t * 60) % height
+        size = (4 + 2 * np.sin(t * 4 + i)).astype(int)
+        visible = (size <= px) & (px <= width - size) & (size <= py) & (py <= height - size)
+        return px * self.scale, py * self.scale, (size * self.scale).astype(int), visible
+    
+    def __call__(self, t: float) -> np.ndarray:
+        if not self._prepared:
+            self._prepare()
+        scaled = self._px
+        # Positions below are in reference units and scaled when composited
+        width, height = REFERENCE_SIZE
+        colors = self.colors
+        
+        # Animated gradient background
+        frame = self.background.frame(t)
+        
+        # Moving circles and floating particles
+        self.decorations.draw(frame, t)
+        
+        # Animated progress bars on the side
+        composite(frame, self.bar_plate)
+        for i, (top, bottom) in enumerate(self.bar_rows):
+            bar_progress = (t * 0.8 + i * 0.5) % 3  # 3-second cycle
+            bar_width = int(150 * min(1, bar_progress))
+            
+            # Ensure bars are within bounds
+            if bar_width > 0 and width - 200 + bar_width <= width - 20:
+                frame[top:bottom, self.bar_x:self.bar_x + scaled(bar_width) + 1] = colors[1]
+        
+        # Animated title
+        title_bounce = int(15 * np.sin(t * 4))
+        composite(frame, self.title_sprite, scaled(60), scaled(180 + title_bounce))
+        
+        # Progressive text reveal
+        chars_per_second = 20
+        chars_revealed = int(chars_per_second * t)
+        
+        y_pos = 280
+        for _, sprite, max_width in self.typewriter.spans(chars_revealed):
+            line_bounce = int(8 * np.sin(t * 3 + y_pos * 0.01))
+            composite(frame, sprite, scaled(60), scaled(y_pos + line_bounce), max_width)
+            y_pos += 60
+        
+        # Data visualization if available
+        if self.data_sprite:
+            data_y = y_pos + 80
+            
+            # Ensure data text is within bounds
+            if data_y + 100 < height:
+                composite(frame, self.data_sprite, scaled(60), scaled(data_y))
+                composite(frame, self.change_sprite, scaled(60), scaled(data_y + 60))
+        
+        return frame
@@ -7,9 +7,12 @@ from PIL import Image
 import moviepy.editor as mp
 import os
 import random
-import time
 from typing import List, Optional
 
+from backgrounds import get_blend_gradient, gradient_image
+from images import KenBurns, fit_to_reel
+from layers import CenteredOverlay, clip_sprite
+
 class AIVideoGenerator:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
@@ -82,25 +85,13 @@ class AIVideoGenerator:
     def _create_fallback_image(self, prompt: str) -> Image.Image:
         """Create a simple fallback image when AI generation fails"""
         
-        # Create a gradient background
-        width, height = 1024, 1024
-        image = Image.new('RGB', (width, height))
-        
         # Generate random colors based on prompt hash
         hash_val = hash(prompt) % 16777215
         color1 = (hash_val & 0xFF0000) >> 16, (hash_val & 0x00FF00) >> 8, hash_val & 0x0000FF
         color2 = ((hash_val + 123456) & 0xFF0000) >> 16, ((hash_val + 123456) & 0x00FF00) >> 8, (hash_val + 123456) & 0x0000FF
         
-        # Create gradient
-        for y in range(height):
-            r = int(color1[0] + (color2[0] - color1[0]) * y / height)
-            g = int(color1[1] + (color2[1] - color1[1]) * y / height)
-            b = int(color1[2] + (color2[2] - color1[2]) * y / height)
-            
-            for x in range(width):
-                image.putpixel((x, y), (r, g, b))
-        
-        return image
+        # Create a gradient background
+        return Image.fromarray(gradient_image((color1, color2), 1024, 1024))
     
     async def _images_to_video(self, images: List[Image.Image], duration: int) -> mp.VideoFileClip:
         """Convert list of images to video with transitions"""
@@ -108,19 +99,11 @@ class AIVideoGenerator:
         clips = []
         duration_per_image = duration / len(images)
         
-        for i, img in enumerate(images):
-            # Resize to reel format (9:16)
-            img_resized = self._resize_to_reel_format(img)
-            
-            # Save temporary image
-            temp_path = f"temp/ai_img_{i}_{int(time.time())}.jpg"
-            img_resized.save(temp_path)
-            
-            # Create video clip
-            clip = mp.ImageClip(temp_path, duration=duration_per_image)
-            
-            # Add some movement/zoom
-            clip = clip.resize(lambda t: 1 + 0.05 * np.sin(2 * np.pi * t / duration_per_image))
+        for img in images:
+            # Resize to reel format (9:16) in memory and add some movement/zoom
+            zoom = KenBurns(fit_to_reel(img), duration_per_image,
+                            zoom=lambda t: 1 + 0.05 * np.sin(2 * np.pi * t / duration_per_image))
+            clip = mp.VideoClip(zoom, duration=duration_per_image)
             
             clips.append(clip)
         
@@ -137,31 +120,6 @@ class AIVideoGenerator:
         video = mp.concatenate_videoclips(final_clips)
         return video
     
-    def _resize_to_reel_format(self, img: Image.Image) -> Image.Image:
-        """Resize image to 9:16 aspect ratio"""
-        target_width, target_height = 1080, 1920
-        
-        # Calculate scaling
-        img_ratio = img.width / img.height
-        target_ratio = target_width / target_height
-        
-        if img_ratio > target_ratio:
-            new_height = target_height
-            new_width = int(new_height * img_ratio)
-        else:
-            new_width = target_width
-            new_height = int(new_width / img_ratio)
-        
-        img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Center on black background
-        background = Image.new('RGB', (target_width, target_height), (0, 0, 0))
-        x_offset = (target_width - new_width) // 2
-        y_offset = (target_height - new_height) // 2
-        background.paste(img_resized, (x_offset, y_offset))
-        
-        return background
-    
     def _generate_styled_prompts(self, base_prompt: str, style: str, duration: int) -> List[str]:
         """Generate multiple prompts for different scenes based on style"""
         
@@ -225,38 +183,11 @@ class AIVideoGenerator:
         
         colors = style_colors.get(style, style_colors['trendy'])
         
-        def make_frame(t):
-            width, height = 1080, 1920
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
-            
-            # Animated gradient with style-specific colors
-            color1 = colors[0]
-            color2 = colors[1]
-            
-            # Add time-based animation
-            wave1 = 0.5 + 0.3 * np.sin(t * 0.8)
-            wave2 = 0.5 + 0.3 * np.cos(t * 0.6 + 1)
-            
-            for y in range(height):
-                for x in range(width):
-                    # Create animated gradient
-                    norm_y = y / height
-                    norm_x = x / width
-                    
-                    # Animated mixing
-                    mix = norm_y * wave1 + norm_x * wave2 * 0.3
-                    mix = max(0, min(1, mix))
-                    
-                    r = int(color1[0] * (1 - mix) + color2[0] * mix)
-                    g = int(color1[1] * (1 - mix) + color2[1] * mix)
-                    b = int(color1[2] * (1 - mix) + color2[2] * mix)
-                    
-                    frame[y, x] = [r, g, b]
-            
-            return frame
+        # Animated gradient with style-specific colors
+        gradient = get_blend_gradient(colors, 1080, 1920)
         
         # Create base video
-        video = mp.VideoClip(make_frame, duration=duration)
+        video = mp.VideoClip(gradient, duration=duration)
         
         # Add text overlay
         try:
@@ -287,11 +218,10 @@ class AIVideoGenerator:
                 method='caption',
                 size=(900, None),
                 align='center'
-            ).set_position('center').set_duration(duration)
+            )
             
-            # Composite video with text
-            final_video = mp.CompositeVideoClip([video, text_clip])
-            return final_video
+            # Composite the static text as a sprite so the batched gradient path still applies
+            return mp.VideoClip(CenteredOverlay(gradient, clip_sprite(text_clip)), duration=duration)
             
         except Exception as e:
             print(f"Error adding text overlay: {e}")
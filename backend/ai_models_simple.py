@@ -5,6 +5,8 @@ import moviepy.editor as mp
 import time
 from typing import List, Optional
 
+from backgrounds import get_blend_gradient
+
 class AIVideoGenerator:
     def __init__(self):
         self.device = "cpu"  # No GPU needed for fallback
@@ -29,36 +31,11 @@ class AIVideoGenerator:
         
         colors = style_colors.get(style, style_colors['trendy'])
         
-        def make_frame(t):
-            width, height = 1080, 1920
-            frame = np.zeros((height, width, 3), dtype=np.uint8)
-            
-            # Animated gradient with style-specific colors
-            color1 = colors[0]
-            color2 = colors[1]
-            
-            # Add time-based animation
-            wave1 = 0.5 + 0.3 * np.sin(t * 0.8)
-            wave2 = 0.5 + 0.3 * np.cos(t * 0.6 + 1)
-            
-            # Simple gradient without nested loops (faster)
-            y_vals = np.linspace(0, 1, height)
-            x_vals = np.linspace(0, 1, width)
-            Y, X = np.meshgrid(y_vals, x_vals, indexing='ij')
-            
-            # Animated mixing
-            mix = Y * wave1 + X * wave2 * 0.3
-            mix = np.clip(mix, 0, 1)
-            
-            # Apply colors
-            frame[:, :, 0] = color1[0] * (1 - mix) + color2[0] * mix
-            frame[:, :, 1] = color1[1] * (1 - mix) + color2[1] * mix
-            frame[:, :, 2] = color1[2] * (1 - mix) + color2[2] * mix
-            
-            return frame.astype(np.uint8)
+        # Animated gradient with style-specific colors
+        gradient = get_blend_gradient(colors, 1080, 1920)
         
         # Create base video
-        video = mp.VideoClip(make_frame, duration=duration)
+        video = mp.VideoClip(gradient, duration=duration)
         
         # Skip text overlay for now to avoid ImageMagick dependency
         print(f"Created video for prompt: {prompt}")
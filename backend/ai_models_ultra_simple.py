@@ -5,6 +5,8 @@ import moviepy.editor as mp
 import time
 from typing import List, Optional
 
+from backgrounds import gradient_image
+
 class AIVideoGenerator:
     def __init__(self):
         self.device = "cpu"
@@ -29,27 +31,7 @@ class AIVideoGenerator:
         
         colors = style_colors.get(style, style_colors['trendy'])
         
-        # Create a simple gradient image
-        width, height = 1080, 1920
-        image = Image.new('RGB', (width, height))
-        
-        # Create gradient
-        for y in range(height):
-            ratio = y / height
-            r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
-            g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
-            b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
-            
-            for x in range(width):
-                image.putpixel((x, y), (r, g, b))
-        
-        # Save the image
-        timestamp = int(time.time())
-        os.makedirs("../temp", exist_ok=True)
-        image_path = f"../temp/gradient_{timestamp}.jpg"
-        image.save(image_path)
-        
-        # Create video clip from the static image
-        video = mp.ImageClip(image_path, duration=duration)
+        # Static gradient, rendered in memory and shared between videos of the same style
+        video = mp.ImageClip(gradient_image(colors, 1080, 1920), duration=duration)
         
         return video
\ No newline at end of file
@@ -0,0 +1,269 @@
+import numpy as np
+from functools import lru_cache
+from typing import Sequence, Tuple
+
+
+def _fill_rows(out: np.ndarray, rows: np.ndarray):
+    """Repeat each row color across the width of out, shape (N, height, width * 3).
+
+    A plain broadcast assignment is slow for 3-byte pixels, so the first
+    pixel column is written once and then doubled with contiguous copies.
+    """
+    width = out.shape[-1] // 3
+    out[..., :3] = rows
+    filled = 1
+    while filled < width:
+        count = min(filled, width - filled)
+        out[..., filled * 3:(filled + count) * 3] = out[..., :count * 3]
+        filled += count
+
+
+class GradientBackground:
+    """Vertical two-color gradient with an optional animated sine wave.
+
+    The per-row ramp and wave phase are computed once, so painting a frame
+    (or a batch of frames) is a single array operation over the rows that is
+    then broadcast across the frame width.
+    """
+
+    def __init__(
+        self,
+        colors: Sequence[Tuple[int, int, int]],
+        width: int = 1080,
+        height: int = 1920,
+        wave_amplitude: float = 0.0,
+        wave_speed: float = 2.0,
+        wave_frequency: float = 0.01
+    ):
+        rows = np.arange(height, dtype=np.float64)
+        self.width = width
+        self.height = height
+        self.wave_amplitude = wave_amplitude
+        self.wave_speed = wave_speed
+        self.ramp = rows / height
+        self.phase = rows * wave_frequency
+        self.color_start = np.asarray(colors[0], dtype=np.float64)
+        self.color_end = np.asarray(colors[1], dtype=np.float64)
+        self._static_frame = None
+
+    @property
+    def is_static(self) -> bool:
+        return not self.wave_amplitude
+
+    def row_colors(self, ts) -> np.ndarray:
+        """Return the RGB color of every row for each time, shape (N, height, 3)"""
+        ts = np.atleast_1d(np.asarray(ts, dtype=np.float64))
+        ratio = np.broadcast_to(self.ramp, (len(ts), self.height))
+        if not self.is_static:
+            wave = self.wave_amplitude * np.sin(ts[:, None] * self.wave_speed + self.phase[None, :])
+            ratio = np.clip(ratio + wave, 0, 1)
+        ratio = ratio[..., None]
+        colors = self.color_start * (1 - ratio) + self.color_end * ratio
+        # astype truncates towards zero, matching the int() of the old per-row loop
+        return colors.astype(np.uint8)
+
+    def frames(self, ts, out: np.ndarray = None) -> np.ndarray:
+        """Render a batch of frames, shape (N, height, width, 3)"""
+        rows = self.row_colors(ts)
+        if out is None:
+            out = np.empty((len(rows), self.height, self.width, 3), dtype=np.uint8)
+        # One frame at a time keeps the doubling copies within the CPU cache
+        for i in range(len(rows)):
+            _fill_rows(out[i].reshape(self.height, self.width * 3), rows[i])
+        return out
+
+    def render_batch(self, ts, out: np.ndarray = None) -> np.ndarray:
+        """Batch rendering entry point used by encoder.write_batched"""
+        return self.frames(ts, out)
+
+    def frame(self, t: float) -> np.ndarray:
+        """Render a single frame, shape (height, width, 3)"""
+        if self.is_static:
+            if self._static_frame is None:
+                self._static_frame = self.frames([0.0])[0]
+            return self._static_frame.copy()
+        return self.frames([t])[0]
+
+    __call__ = frame
+
+
+@lru_cache(maxsize=64)
+def _cached_background(colors, width, height, wave_amplitude, wave_speed, wave_frequency) -> GradientBackground:
+    return GradientBackground(colors, width, height, wave_amplitude, wave_speed, wave_frequency)
+
+
+def get_background(
+    colors: Sequence[Tuple[int, int, int]],
+    width: int = 1080,
+    height: int = 1920,
+    wave_amplitude: float = 0.0,
+    wave_speed: float = 2.0,
+    wave_frequency: float = 0.01
+) -> GradientBackground:
+    """Return a shared background engine for a style's color pair and size"""
+    key_colors = tuple(tuple(int(c) for c in color) for color in colors[:2])
+    return _cached_background(key_colors, width, height, wave_amplitude, wave_speed, wave_frequency)
+
+
+def color_ramp(colors: Sequence[Tuple[int, int, int]], levels: int = 4096) -> np.ndarray:
+    """Lookup table of levels colors blending colors[0] into colors[1], shape (levels, 3).
+
+    Indexing it with a quantized blend factor turns a float field into RGB
+    pixels in a single pass, instead of blending each channel in float.
+    """
+    steps = np.arange(levels)[:, None] / (levels - 1)
+    color_start = np.asarray(colors[0], dtype=np.float64)
+    color_end = np.asarray(colors[1], dtype=np.float64)
+    return (color_start * (1 - steps) + color_end * steps).astype(np.uint8)
+
+
+class BlendGradient:
+    """Two-color gradient mixed along both axes with slowly drifting weights.
+
+    Each pixel blends by clip(y * wave_y(t) + x * wave_x(t) * 0.3, 0, 1) in
+    normalized coordinates. The blend is separable into a per-row and a
+    per-column term, so a frame is one broadcast add of two fixed-point
+    vectors followed by a lookup into a precomputed color ramp, instead of
+    float math (or a Python loop) over every pixel.
+    """
+
+    levels = 4096
+
+    def __init__(self, colors: Sequence[Tuple[int, int, int]], width: int = 1080, height: int = 1920):
+        self.width = width
+        self.height = height
+        self.ys = np.linspace(0, 1, height)
+        self.xs = np.linspace(0, 1, width)
+        self.lut = color_ramp(colors, self.levels)
+
+    def mix_indices(self, ts) -> Tuple[np.ndarray, np.ndarray]:
+        """Quantized row and column terms of the blend for each time, shapes (N, height) and (N, width)"""
+        ts = np.atleast_1d(np.asarray(ts, dtype=np.float64))
+        wave_y = 0.5 + 0.3 * np.sin(ts * 0.8)
+        wave_x = 0.5 + 0.3 * np.cos(ts * 0.6 + 1)
+        scale = self.levels - 1
+        # np.take wants intp indices, so build them as intp to skip a conversion
+        rows = np.round(np.outer(wave_y * scale, self.ys)).astype(np.intp)
+        cols = np.round(np.outer(wave_x * 0.3 * scale, self.xs)).astype(np.intp)
+        return rows, cols
+
+    def render_batch(self, ts, out: np.ndarray = None) -> np.ndarray:
+        """Render a batch of frames, shape (N, height, width, 3)"""
+        rows, cols = self.mix_indices(ts)
+        if out is None:
+            out = np.empty((len(rows), self.height, self.width, 3), dtype=np.uint8)
+        index = np.empty((self.height, self.width), dtype=np.intp)
+        for i in range(len(rows)):
+            np.add(rows[i][:, None], cols[i][None, :], out=index)
+            # Both weights stay positive, so only the upper bound needs clipping
+            np.minimum(index, self.levels - 1, out=index)
+            np.take(self.lut, index, axis=0, out=out[i])
+        return out
+
+    def frame(self, t: float) -> np.ndarray:
+        """Render a single frame, shape (height, width, 3)"""
+        return self.render_batch([t])[0]
+
+    __call__ = frame
+
+
+@lru_cache(maxsize=64)
+def _cached_blend(colors, width, height) -> BlendGradient:
+    return BlendGradient(colors, width, height)
+
+
+def get_blend_gradient(
+    colors: Sequence[Tuple[int, int, int]],
+    width: int = 1080,
+    height: int = 1920
+) -> BlendGradient:
+    """Return a shared two-axis blend gradient for a style's color pair and size"""
+    key_colors = tuple(tuple(int(c) for c in color) for color in colors[:2])
+    return _cached_blend(key_colors, width, height)
+
+
+def gradient_image(colors: Sequence[Tuple[int, int, int]], width: int = 1080, height: int = 1920) -> np.ndarray:
+    """Static vertical gradient, rendered once per color pair and size"""
+    return get_background(colors, width, height).frame(0.0)
+
+
+@lru_cache(maxsize=8)
+def radial_fields(width: int = 1080, height: int = 1920) -> Tuple[np.ndarray, np.ndarray]:
+    """Time-independent fields of the animated radial gradient, as float32.
+
+    Returns the vertical ramp, shape (height, 1), and the distance of every
+    pixel from the frame center in normalized coordinates, shape
+    (height, width). Computed once per resolution and shared read-only.
+    """
+    ys = np.linspace(0, 1, height, dtype=np.float32)[:, None]
+    xs = np.linspace(0, 1, width, dtype=np.float32)[None, :]
+    radial = np.sqrt((xs - 0.5) ** 2 + (ys - 0.5) ** 2)
+    ys.flags.writeable = False
+    radial.flags.writeable = False
+    return ys, radial
+
+
+class NoiseBank:
+    """Rotating bank of pre-generated float32 noise strips for film-grain texture.
+
+    Instead of drawing a full frame of random numbers per frame, a few
+    full-width strips are generated up front and tiled down the frame, with
+    the strip picked from the frame time. The same t always gets the same
+    noise, so frames are reproducible across render workers.
+    """
+
+    def __init__(
+        self,
+        width: int = 1080,
+        strips: int = 16,
+        strip_height: int = 120,
+        amplitude: float = 0.05,
+        seed: int = 0
+    ):
+        rng = np.random.default_rng(seed)
+        self.width = width
+        self.strip_height = strip_height
+        self.strips = rng.random((strips, strip_height, width), dtype=np.float32)
+        self.strips *= amplitude
+        self.strips.flags.writeable = False
+
+    def strip(self, t: float) -> np.ndarray:
+        # Millisecond index, so consecutive frames at any common fps land on different strips
+        return self.strips[int(round(t * 1000)) % len(self.strips)]
+
+    def add_to(self, field: np.ndarray, t: float):
+        """Add the noise for time t to a (height, width) field in place"""
+        strip = self.strip(t)
+        full = field.shape[0] // self.strip_height * self.strip_height
+        tiled = field[:full].reshape(-1, self.strip_height, field.shape[1])
+        tiled += strip
+        field[full:] += strip[:field.shape[0] - full]
+
+
+@lru_cache(maxsize=8)
+def get_noise_bank(width: int = 1080, amplitude: float = 0.05) -> NoiseBank:
+    """Return the shared noise bank for a frame width and amplitude"""
+    return NoiseBank(width, amplitude=amplitude)
+
+
+class RandomNoiseBackground:
+    """Uniform random RGB noise, seeded from the frame time so renders are reproducible"""
+
+    def __init__(self, width: int = 1080, height: int = 1920, low: int = 50, high: int = 200):
+        self.width = width
+        self.height = height
+        self.low = low
+        self.high = high
+
+    def render_batch(self, ts, out: np.ndarray = None) -> np.ndarray:
+        """Render a batch of frames, shape (N, height, width, 3)"""
+        ts = np.atleast_1d(np.asarray(ts, dtype=np.float64))
+        if out is None:
+            out = np.empty((len(ts), self.height, self.width, 3), dtype=np.uint8)
+        for i, t in enumerate(ts):
+            rng = np.random.default_rng(int(round(t * 1000)))
+            out[i] = rng.integers(self.low, self.high, out.shape[1:], dtype=np.uint8)
+        return out
+
+    def __call__(self, t: float) -> np.ndarray:
+        return self.render_batch([t])[0]
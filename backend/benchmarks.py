@@ -0,0 +1,619 @@
+"""
+Rendering benchmarks for the reel generators.
+
+Run from the backend directory:
+    python benchmarks.py              # run every benchmark
+    python benchmarks.py backgrounds  # run a single benchmark
+"""
+
+import os
+import sys
+import time
+from typing import List
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from backgrounds import GradientBackground, get_background, get_blend_gradient, gradient_image
+
+WIDTH, HEIGHT = 1080, 1920
+COLORS = ((255, 20, 147), (138, 43, 226))
+
+
+def _time_per_call(fn, repeats: int) -> float:
+    """Return the average seconds per call of fn()"""
+    fn()  # warm up caches
+    start = time.perf_counter()
+    for _ in range(repeats):
+        fn()
+    return (time.perf_counter() - start) / repeats
+
+
+def _report(name: str, before: float, after: float):
+    print(f"  {name:<28} before: {1 / before:8.1f} fps   after: {1 / after:8.1f} fps   "
+          f"speedup: {before / after:6.1f}x")
+
+
+def _report_rate(name: str, seconds: float):
+    print(f"  {name:<28} {seconds * 1000:8.2f} ms/frame   {1 / seconds:8.1f} fps")
+
+
+def _legacy_wave_gradient(t: float, colors, amplitude: float, frequency: float) -> np.ndarray:
+    """The per-row draw.line gradient the generators used before the NumPy engine"""
+    img = Image.new('RGB', (WIDTH, HEIGHT), colors[0])
+    draw = ImageDraw.Draw(img)
+    for y in range(HEIGHT):
+        ratio = y / HEIGHT
+        if amplitude:
+            wave = amplitude * np.sin(t * 2 + y * frequency)
+            ratio = max(0, min(1, ratio + wave))
+        r = int(colors[0][0] * (1-ratio) + colors[1][0] * ratio)
+        g = int(colors[0][1] * (1-ratio) + colors[1][1] * ratio)
+        b = int(colors[0][2] * (1-ratio) + colors[1][2] * ratio)
+        draw.line([(0, y), (WIDTH, y)], fill=(r, g, b))
+    return np.array(img)
+
+
+def bench_backgrounds():
+    """Gradient backgrounds at 1080x1920: per-row draw.line loop vs NumPy engine"""
+    cases = [
+        ("static gradient", 0.0, 0.01),
+        ("fact card wave", 0.1, 0.01),
+        ("enhanced card wave", 0.15, 0.005),
+    ]
+    for name, amplitude, frequency in cases:
+        engine = GradientBackground(COLORS, WIDTH, HEIGHT, amplitude, 2, frequency)
+        t = 1.37
+        assert np.array_equal(engine.frame(t), _legacy_wave_gradient(t, COLORS, amplitude, frequency))
+        before = _time_per_call(lambda: _legacy_wave_gradient(t, COLORS, amplitude, frequency), 5)
+        after = _time_per_call(lambda: engine.frame(t), 50)
+        _report(name, before, after)
+
+    engine = GradientBackground(COLORS, WIDTH, HEIGHT, 0.15, 2, 0.005)
+    ts = np.arange(24) / 24
+    out = np.empty((len(ts), HEIGHT, WIDTH, 3), dtype=np.uint8)
+    before = _time_per_call(lambda: _legacy_wave_gradient(0.5, COLORS, 0.15, 0.005), 5)
+    after = _time_per_call(lambda: engine.frames(ts, out=out), 5) / len(ts)
+    _report("enhanced wave, batch of 24", before, after)
+
+
+def bench_cards():
+    """Per-frame cost of the segment cards at 1080x1920"""
+    from ai_content_generator import AIContentGenerator
+
+    generator = AIContentGenerator()
+    colors = generator._get_style_colors('trendy')
+    fact = "NVIDIA (NVDA) - AI chip leader, 239% YTD growth"
+    data = {"label": "NVIDIA", "value": "$890", "change": "+239% YTD"}
+    conclusion = "Remember: AI revolution drives tech stocks, EV adoption accelerating. What's your take?"
+    cards = [
+        ("fact card", generator._create_enhanced_visual(fact, data, colors, 6)),
+        ("conclusion card", generator._create_enhanced_visual(conclusion, None, colors, 6)),
+    ]
+    ts = np.arange(0, 6, 1 / 24)
+    for name, clip in cards:
+        seconds = _time_per_call(lambda: [clip.get_frame(t) for t in ts], 1) / len(ts)
+        _report_rate(name, seconds)
+
+
+def bench_parallel():
+    """Parallel frame rendering of a fact card: throughput by worker count (encoder excluded)"""
+    from ai_content_generator import EnhancedCardRenderer
+    from parallel_render import ParallelRenderer
+
+    renderer = EnhancedCardRenderer(
+        "NVIDIA (NVDA) - AI chip leader, 239% YTD growth",
+        {"label": "NVIDIA", "value": "$890", "change": "+239% YTD"},
+        COLORS
+    )
+    duration, fps = 10, 24
+    cores = os.cpu_count() or 1
+    counts = sorted({1, cores} | {n for n in (2, 4, 8, 16, 32, 64) if n <= cores})
+    baseline = None
+    for workers in counts:
+        start = time.perf_counter()
+        for _ in ParallelRenderer(workers).iter_frames(renderer, duration, fps, (WIDTH, HEIGHT)):
+            pass
+        seconds = (time.perf_counter() - start) / (duration * fps)
+        baseline = baseline or seconds
+        print(f"  {workers:>3} workers   {1 / seconds:8.1f} fps   scaling: {baseline / seconds:5.2f}x   "
+              f"efficiency: {baseline / seconds / workers:6.1%}")
+
+
+def bench_encoder():
+    """Export of a 4 s clip with audio: moviepy write_videofile vs ffmpeg pipe writer"""
+    import tempfile
+    import moviepy.editor as mp
+    from encoder import EncoderSettings, write_clip
+
+    engine = GradientBackground(COLORS, WIDTH, HEIGHT, 0.15, 2, 0.005)
+    duration, fps = 4, 24
+    audio = mp.AudioClip(lambda t: np.sin(2 * np.pi * 440 * t), duration=duration, fps=44100)
+    clip = mp.VideoClip(engine.frame, duration=duration).set_audio(audio)
+    settings = EncoderSettings(preset='ultrafast')
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bench.mp4")
+        temp_audio = os.path.join(temp_dir, "bench_audio.mp3")
+        before = _time_per_call(lambda: clip.write_videofile(
+            path, fps=fps, codec='libx264', preset='ultrafast', temp_audiofile=temp_audio,
+            verbose=False, logger=None), 1) / (duration * fps)
+        after = _time_per_call(lambda: write_clip(clip, path, fps, settings), 1) / (duration * fps)
+    _report("export, ultrafast preset", before, after)
+
+
+def bench_profiles():
+    """Render + encode of a 4 s fact card under each quality profile"""
+    import tempfile
+    from ai_content_generator import EnhancedCardRenderer
+    from encoder import EncoderSettings, write_frames
+    from render_profiles import PROFILES
+
+    duration = 4
+    costs = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bench.mp4")
+        for name, profile in PROFILES.items():
+            renderer = EnhancedCardRenderer(
+                "NVIDIA (NVDA) - AI chip leader, 239% YTD growth",
+                {"label": "NVIDIA", "value": "$890", "change": "+239% YTD"},
+                COLORS,
+                profile.size
+            )
+            settings = profile.encoder_settings(EncoderSettings())
+            ts = np.arange(duration * profile.fps) / profile.fps
+            costs[name] = _time_per_call(lambda: write_frames(
+                (renderer(t) for t in ts), path, profile.size, profile.fps, settings), 1)
+            print(f"  {name:<10} {profile.width}x{profile.height} @ {profile.fps:>2} fps, "
+                  f"{settings.preset:<9}  {costs[name]:6.2f} s   ({costs[name] / duration:5.2f} s per video second)")
+    print(f"  draft is {costs['standard'] / costs['draft']:.1f}x cheaper than standard")
+
+
+def _legacy_putpixel_gradient(colors, width: int, height: int) -> Image.Image:
+    """The putpixel gradient the ai_models fallbacks drew before the shared factory"""
+    image = Image.new('RGB', (width, height))
+    for y in range(height):
+        ratio = y / height
+        r = int(colors[0][0] * (1 - ratio) + colors[1][0] * ratio)
+        g = int(colors[0][1] * (1 - ratio) + colors[1][1] * ratio)
+        b = int(colors[0][2] * (1 - ratio) + colors[1][2] * ratio)
+        for x in range(width):
+            image.putpixel((x, y), (r, g, b))
+    return image
+
+
+def _legacy_blend_frame(t: float, colors, width: int, height: int) -> np.ndarray:
+    """The per-pixel animated blend of ai_models._create_fallback_video"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    wave1 = 0.5 + 0.3 * np.sin(t * 0.8)
+    wave2 = 0.5 + 0.3 * np.cos(t * 0.6 + 1)
+    for y in range(height):
+        for x in range(width):
+            mix = max(0, min(1, y / height * wave1 + x / width * wave2 * 0.3))
+            frame[y, x] = [int(colors[0][i] * (1 - mix) + colors[1][i] * mix) for i in range(3)]
+    return frame
+
+
+def _print_seconds(name: str, before: float, after: float):
+    print(f"  {name:<28} before: {before * 1000:9.1f} ms   after: {after * 1000:7.2f} ms   "
+          f"speedup: {before / after:8.1f}x")
+
+
+def bench_gradients():
+    """Fallback gradients of the ai_models generators: putpixel/per-pixel loops vs shared factory"""
+    static_before = _time_per_call(lambda: _legacy_putpixel_gradient(COLORS, WIDTH, HEIGHT), 1)
+    static_after = _time_per_call(lambda: gradient_image(COLORS, WIDTH, HEIGHT), 20)
+    assert np.array_equal(np.array(_legacy_putpixel_gradient(COLORS, WIDTH, HEIGHT)),
+                          gradient_image(COLORS, WIDTH, HEIGHT))
+    _print_seconds("static gradient 1080x1920", static_before, static_after)
+
+    # The per-pixel loop takes minutes at full size, so compare on a small frame
+    small_w, small_h = 135, 240
+    small = get_blend_gradient(COLORS, small_w, small_h)
+    t = 1.37
+    assert np.abs(small.frame(t).astype(int) - _legacy_blend_frame(t, COLORS, small_w, small_h)).max() <= 1
+    blend_before = _time_per_call(lambda: _legacy_blend_frame(t, COLORS, small_w, small_h), 1)
+    blend_after = _time_per_call(lambda: small.frame(t), 50)
+    _print_seconds(f"animated blend {small_w}x{small_h}", blend_before, blend_after)
+
+    engine = get_blend_gradient(COLORS, WIDTH, HEIGHT)
+    _report_rate("animated blend 1080x1920", _time_per_call(lambda: engine.frame(t), 20))
+
+
+def _legacy_animated_gradient(t: float, colors, width: int = WIDTH, height: int = HEIGHT) -> np.ndarray:
+    """SimpleVideoGenerator's animated gradient before the precomputed fields and noise bank"""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    wave1 = 0.5 + 0.3 * np.sin(t * 1.5)
+    wave2 = 0.5 + 0.2 * np.cos(t * 2.3 + 1)
+    wave3 = 0.5 + 0.1 * np.sin(t * 0.8 + 3)
+    y_vals = np.linspace(0, 1, height)
+    x_vals = np.linspace(0, 1, width)
+    Y, X = np.meshgrid(y_vals, x_vals, indexing='ij')
+    radial_gradient = np.sqrt((X - 0.5)**2 + (Y - 0.5)**2)
+    mix = np.clip((Y * wave1 + radial_gradient * wave2) * wave3, 0, 1)
+    noise = np.random.random((height, width)) * 0.05
+    mix = np.clip(mix + noise, 0, 1)
+    for channel in range(3):
+        frame[:, :, channel] = colors[0][channel] * (1 - mix) + colors[1][channel] * mix
+    return frame
+
+
+def _peak_bytes(fn) -> int:
+    """Peak traced allocation of one fn() call (NumPy buffers are traced too)"""
+    import tracemalloc
+
+    fn()  # build shared caches outside the measurement
+    tracemalloc.start()
+    try:
+        fn()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_animated_gradient():
+    """SimpleVideoGenerator animated gradient: per-frame fields and noise vs precomputed fields and noise bank"""
+    from simple_video_generator import AnimatedGradientRenderer
+
+    renderer = AnimatedGradientRenderer(COLORS)
+    ts = np.arange(0, 2, 1 / 15)
+    before = _time_per_call(lambda: [_legacy_animated_gradient(t, COLORS) for t in ts], 1) / len(ts)
+    after = _time_per_call(lambda: [renderer(t) for t in ts], 3) / len(ts)
+    _report("animated gradient 1080x1920", before, after)
+
+    peak_before = _peak_bytes(lambda: _legacy_animated_gradient(0.5, COLORS))
+    peak_after = _peak_bytes(lambda: renderer(0.5))
+    print(f"  {'peak memory per frame':<28} before: {peak_before / 2**20:7.1f} MB   "
+          f"after: {peak_after / 2**20:7.1f} MB")
+
+
+def bench_batch():
+    """Encode of 4 s procedural clips: moviepy frame by frame vs render_batch into a reused buffer"""
+    import tempfile
+    import moviepy.editor as mp
+    from backgrounds import RandomNoiseBackground
+    from encoder import EncoderSettings, batch_length, write_batched, write_frames
+    from simple_video_generator import AnimatedGradientRenderer
+
+    duration, fps = 4, 15
+    settings = EncoderSettings(preset='ultrafast')
+    renderers = [
+        ("wave gradient", get_background(COLORS, WIDTH, HEIGHT, wave_amplitude=0.15)),
+        ("animated gradient", AnimatedGradientRenderer(COLORS)),
+        ("two-axis blend", get_blend_gradient(COLORS, WIDTH, HEIGHT)),
+        ("random noise", RandomNoiseBackground(WIDTH, HEIGHT)),
+    ]
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "bench.mp4")
+        for name, renderer in renderers:
+            clip = mp.VideoClip(renderer, duration=duration)
+            before = _time_per_call(lambda: write_frames(
+                clip.iter_frames(fps=fps, dtype='uint8'), path, (WIDTH, HEIGHT), fps, settings), 1)
+            after = _time_per_call(lambda: write_batched(
+                renderer, duration, path, fps, (WIDTH, HEIGHT), settings), 1)
+            _report(name, before / (duration * fps), after / (duration * fps))
+    print(f"  batch length under the default memory cap: {batch_length((WIDTH, HEIGHT))} frames")
+
+
+def _spiral(t, i):
+    """Motion of the conclusion card's spiral dots, on scalars or broadcast arrays"""
+    spiral, angle_step = i // 24, (i % 24) * 15
+    angle = np.radians(angle_step + t * 100 + spiral * 120)
+    radius = 100 + spiral * 80 + 30 * np.sin(t * 2 + spiral)
+    x = WIDTH // 2 + radius * np.cos(angle)
+    y = HEIGHT // 2 + radius * np.sin(angle)
+    return x, y, (8 + 4 * np.sin(t * 3 + angle_step)).astype(int), None
+
+
+def _legacy_particles(t: float, background: np.ndarray) -> np.ndarray:
+    """One draw.ellipse and one draw.line call per element, as the cards drew them before"""
+    img = Image.fromarray(background)
+    draw = ImageDraw.Draw(img)
+    for i in range(72):
+        x, y, size, _ = _spiral(t, np.array(i))
+        draw.ellipse([x - size, y - size, x + size, y + size], fill=COLORS[0])
+    for i in range(12):
+        angle = np.radians(i * 30 + t * 50)
+        length = 200 + 50 * np.sin(t * 2 + i)
+        draw.line([(WIDTH // 2 + 50 * np.cos(angle), HEIGHT // 2 + 50 * np.sin(angle)),
+                   (WIDTH // 2 + length * np.cos(angle), HEIGHT // 2 + length * np.sin(angle))],
+                  fill='white', width=max(1, int(3 + 2 * np.sin(t * 4 + i))))
+    return np.array(img)
+
+
+def bench_particles():
+    """72 dots and 12 lines of the conclusion card: per-primitive PIL drawing vs particle system"""
+    from particles import LineLayer, ParticleLayer, ParticleSystem, shape_sprite
+
+    def rays(t, i):
+        angle = np.radians(i * 30 + t * 50)
+        length = 200 + 50 * np.sin(t * 2 + i)
+        return (WIDTH // 2 + 50 * np.cos(angle), HEIGHT // 2 + 50 * np.sin(angle),
+                WIDTH // 2 + length * np.cos(angle), HEIGHT // 2 + length * np.sin(angle),
+                np.maximum(1, (3 + 2 * np.sin(t * 4 + i)).astype(int)))
+
+    duration, fps = 6, 24
+    ts = np.arange(0, duration, 1 / fps)
+    background = np.full((HEIGHT, WIDTH, 3), COLORS[1], dtype=np.uint8)
+    system = ParticleSystem([ParticleLayer(_spiral, ['circle'] * 72, [COLORS[0]] * 72),
+                             LineLayer(rays, 12, 'white')], fps, duration)
+
+    def draw_all():
+        for t in ts:
+            frame = background.copy()
+            system.draw(frame, t)
+
+    before = _time_per_call(lambda: [_legacy_particles(t, background) for t in ts], 1) / len(ts)
+    shape_sprite.cache_clear()
+    start = time.perf_counter()
+    draw_all()
+    cold = (time.perf_counter() - start) / len(ts)
+    after = _time_per_call(draw_all, 1) / len(ts)
+    _report("particles (warm atlas)", before, after)
+    _report_rate("particles (cold atlas)", cold)
+    print(f"  atlas entries: {shape_sprite.cache_info().currsize}")
+
+
+def bench_holds():
+    """Export of a 15 s still at 15 fps: every frame encoded vs held frames"""
+    import tempfile
+    import moviepy.editor as mp
+    from encoder import EncoderSettings, PCMAudioClip, StillSequence, write_clip, write_frames
+
+    duration, fps = 15, 15
+    settings = EncoderSettings()
+    clip = mp.ImageClip(gradient_image(COLORS, WIDTH, HEIGHT), duration=duration)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        before_path = os.path.join(temp_dir, "frames.mp4")
+        after_path = os.path.join(temp_dir, "holds.mp4")
+        before = _time_per_call(lambda: write_frames(
+            clip.iter_frames(fps=fps, dtype='uint8'), before_path, (WIDTH, HEIGHT), fps, settings), 1)
+        after = _time_per_call(lambda: write_clip(clip, after_path, fps, settings), 1)
+        _print_seconds("still image", before, after)
+        print(f"  file size: {os.path.getsize(before_path) / 1024:.1f} KB -> "
+              f"{os.path.getsize(after_path) / 1024:.1f} KB")
+
+        # A slideshow with audio must decode to the same frames per still as a constant rate export
+        slideshow_path = os.path.join(temp_dir, "slideshow.mp4")
+        durations, slideshow_fps = [1.0, 0.5, 1.5], 10
+        stills = [np.full((64, 64, 3), level, dtype=np.uint8) for level in (30, 130, 230)]
+        slideshow = mp.VideoClip(StillSequence(stills, durations), duration=sum(durations))
+        slideshow = slideshow.set_audio(PCMAudioClip(np.zeros(int(sum(durations) * 44100), dtype=np.float32)))
+        write_clip(slideshow, slideshow_path, slideshow_fps, settings)
+        expected = [int(round(d * slideshow_fps)) for d in durations]
+        counts = _decoded_runs(slideshow_path, slideshow_fps)
+        read_fps = mp.VideoFileClip(slideshow_path).fps
+        print(f"  slideshow frames per still: {counts} (expected {expected}), read back at {read_fps} fps")
+        if counts != expected or read_fps != slideshow_fps:
+            raise AssertionError(f"held-frame export decodes to {counts} frames per still at {read_fps} fps, "
+                                 f"expected {expected} at {slideshow_fps} fps")
+
+
+def _decoded_runs(path: str, fps: float) -> List[int]:
+    """Decode a video at a constant fps and count consecutive frames of the same flat color"""
+    import subprocess
+    from encoder import ffmpeg_binary
+
+    raw = subprocess.run([ffmpeg_binary(), '-v', 'error', '-i', path, '-r', str(fps), '-s', '8x8',
+                          '-f', 'rawvideo', '-pix_fmt', 'gray', 'pipe:1'], capture_output=True, check=True).stdout
+    levels = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 64).mean(axis=1)
+    counts = []
+    for i, level in enumerate(levels):
+        if i and abs(level - levels[i - 1]) < 5:
+            counts[-1] += 1
+        else:
+            counts.append(1)
+    return counts
+
+
+def _legacy_reel_image(path: str, temp_path: str) -> np.ndarray:
+    """Full-size decode and resize, then the temp JPEG round trip the generators used"""
+    img = Image.open(path)
+    ratio = img.width / img.height
+    if ratio > WIDTH / HEIGHT:
+        new_width, new_height = int(HEIGHT * ratio), HEIGHT
+    else:
+        new_width, new_height = WIDTH, int(WIDTH / ratio)
+    background = Image.new('RGB', (WIDTH, HEIGHT), (0, 0, 0))
+    background.paste(img.resize((new_width, new_height), Image.Resampling.LANCZOS),
+                     ((WIDTH - new_width) // 2, (HEIGHT - new_height) // 2))
+    background.save(temp_path)
+    return np.array(Image.open(temp_path))
+
+
+def bench_images():
+    """Four 12 MP JPEG uploads to reel frames: temp JPEG round trip vs in-memory, draft decode, threads"""
+    import tempfile
+    from images import load_reel_images
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        paths = []
+        for i, size in enumerate([(4032, 3024), (3024, 4032)] * 2):
+            path = os.path.join(temp_dir, f"photo_{i}.jpg")
+            Image.fromarray(gradient_image(COLORS, *size)).save(path, quality=92)
+            paths.append(path)
+        temp_path = os.path.join(temp_dir, "temp_img.jpg")
+        before = _time_per_call(lambda: [_legacy_reel_image(path, temp_path) for path in paths], 1)
+        after = _time_per_call(lambda: load_reel_images(paths), 1)
+        _print_seconds("4 uploads", before, after)
+
+
+def bench_kenburns():
+    """Slow zoom over a 4 s still at 15 fps: moviepy clip.resize vs precomputed affine warps"""
+    import moviepy.editor as mp
+    from images import KenBurns
+
+    duration, fps = 4, 15
+    ts = np.arange(0, duration, 1 / fps)
+    still = gradient_image(COLORS, WIDTH, HEIGHT)
+    resized = mp.ImageClip(still, duration=duration).resize(lambda t: 1 + 0.1 * t)
+    zoom = KenBurns(still, duration, zoom=(1.0, 1.0 + 0.1 * duration), fps=fps)
+    sharp = KenBurns(still, duration, zoom=(1.0, 1.0 + 0.1 * duration), fps=fps, upscale=True)
+    before = _time_per_call(lambda: [resized.get_frame(t) for t in ts], 1) / len(ts)
+    _report("zoom (per frame)", before, _time_per_call(lambda: [zoom(t) for t in ts], 1) / len(ts))
+    _report("zoom (pre-upscaled source)", before, _time_per_call(lambda: [sharp(t) for t in ts], 1) / len(ts))
+    buffer = np.empty((len(ts), HEIGHT, WIDTH, 3), dtype=np.uint8)
+    _report_rate("zoom (render_batch)", _time_per_call(lambda: zoom.render_batch(ts, buffer), 1) / len(ts))
+    last = resized.get_frame(ts[-1]).shape
+    print(f"  last frame: clip.resize {last[1]}x{last[0]}, KenBurns {WIDTH}x{HEIGHT}")
+
+
+def _legacy_trendy_beat(duration: int, sample_rate: int = 44100) -> np.ndarray:
+    """The per-hit Python loops AudioProcessor used for the trendy beat"""
+    samples = int(duration * sample_rate)
+    audio = np.zeros(samples)
+    for i in range(0, samples, sample_rate // 2):
+        if i + 1000 < samples:
+            kick = np.sin(2 * np.pi * 60 * np.arange(1000) / sample_rate) * np.exp(-np.arange(1000) / 500)
+            audio[i:i + 1000] += kick * 0.5
+    for i in range(0, samples, sample_rate // 4):
+        if i + 200 < samples:
+            hihat = np.random.normal(0, 0.1, 200) * np.exp(-np.arange(200) / 50)
+            audio[i:i + 200] += hihat * 0.2
+    return audio / np.max(np.abs(audio)) * 0.8
+
+
+def _legacy_chill_music(duration: int, sample_rate: int = 44100) -> np.ndarray:
+    samples = int(duration * sample_rate)
+    audio = np.zeros(samples)
+    for i, freq in enumerate([196, 294, 370, 440]):
+        wave = np.sin(2 * np.pi * freq * np.arange(samples) / sample_rate)
+        wave += 0.3 * np.sin(2 * np.pi * freq * 2 * np.arange(samples) / sample_rate)
+        wave *= 1 + 0.05 * np.sin(2 * np.pi * 3 * np.arange(samples) / sample_rate)
+        audio += wave * (0.2 - i * 0.02)
+    return audio
+
+
+def bench_music():
+    """60 s background tracks: float64 full-length synthesis vs tiling cached float32 stems"""
+    from music import music_pcm, stem
+
+    for name, legacy in (("electronic", _legacy_trendy_beat), ("chill", _legacy_chill_music)):
+        before = _time_per_call(lambda: legacy(60), 3)
+        stem.cache_clear()
+        start = time.perf_counter()
+        music_pcm(name, 60)
+        cold = time.perf_counter() - start
+        _print_seconds(f"{name} (first track)", before, cold)
+        _print_seconds(f"{name} (cached stem)", before, _time_per_call(lambda: music_pcm(name, 60), 3))
+
+
+def _legacy_audio_pcm(pcm: np.ndarray, path: str) -> np.ndarray:
+    """The temp WAV round trip: write 16-bit PCM, reopen with AudioFileClip, read it back"""
+    import wave
+    import moviepy.editor as mp
+    from encoder import clip_audio_pcm
+
+    with wave.open(path, 'w') as wav_file:
+        wav_file.setnchannels(1)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(44100)
+        wav_file.writeframes((pcm * 32767).astype(np.int16).tobytes())
+    audio = mp.AudioFileClip(path)
+    try:
+        return clip_audio_pcm(mp.ColorClip((2, 2), color=(0, 0, 0), duration=audio.duration).set_audio(audio))
+    finally:
+        audio.close()
+
+
+def bench_audio():
+    """15 s generated track to encoder PCM: temp WAV + AudioFileClip vs in-memory PCMAudioClip"""
+    import tempfile
+    import moviepy.editor as mp
+    from encoder import PCMAudioClip, clip_audio_pcm
+    from music import style_music_pcm
+
+    pcm = style_music_pcm('trendy', 15)
+    video = mp.ColorClip((2, 2), color=(0, 0, 0), duration=15)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = os.path.join(temp_dir, "generated_audio.wav")
+        before = _time_per_call(lambda: _legacy_audio_pcm(pcm, path), 1)
+    after = _time_per_call(lambda: clip_audio_pcm(video.set_audio(PCMAudioClip(pcm))), 3)
+    _print_seconds("15 s track", before, after)
+
+
+class _NetworkTTS:
+    """Offline stub that sleeps like a 300 ms TTS round trip per request"""
+
+    name = "bench"
+
+    def __init__(self):
+        from tts import StubBackend
+        self.stub = StubBackend()
+
+    def synthesize(self, text: str, language: str, sample_rate: int) -> np.ndarray:
+        time.sleep(0.3)
+        return self.stub.synthesize(text, language, sample_rate)
+
+
+def bench_tts():
+    """Four-segment voiceover with 300 ms TTS calls: one at a time vs parallel segments, then cached"""
+    import asyncio
+    import tempfile
+    from tts import VoiceoverSynthesizer
+
+    texts = [f"Fact number {i} about the topic, spoken as its own segment." for i in range(4)]
+    backend = _NetworkTTS()
+    before = _time_per_call(lambda: [backend.synthesize(text, 'en', 44100) for text in texts], 1)
+    with tempfile.TemporaryDirectory() as temp_dir:
+        synthesizer = VoiceoverSynthesizer(backend, cache_dir=temp_dir, max_workers=4)
+        start = time.perf_counter()
+        asyncio.run(synthesizer.synthesize(texts))
+        _print_seconds("voiceover (first reel)", before, time.perf_counter() - start)
+        cached = _time_per_call(lambda: asyncio.run(synthesizer.synthesize(texts)), 3)
+        _print_seconds("voiceover (repeat reel)", before, cached)
+
+
+def bench_mixer():
+    """15 s soundtrack to encoder PCM: moviepy silence padding and clip looping vs the numpy mixer"""
+    import moviepy.editor as mp
+    from encoder import PCMAudioClip, audio_pcm
+    from mixer import mix
+    from music import style_music_pcm
+    from tts import StubBackend
+
+    voice = StubBackend().synthesize(" ".join(["word"] * 25), "en")
+    music = style_music_pcm('trendy', 4)
+
+    def legacy_voice():
+        audio = PCMAudioClip(voice)
+        silence = mp.AudioClip(lambda t: 0, duration=15 - audio.duration)
+        return audio_pcm(mp.concatenate_audioclips([audio, silence]))
+
+    def legacy_music():
+        audio = PCMAudioClip(music)
+        loops = int(15 / audio.duration) + 1
+        return audio_pcm(mp.concatenate_audioclips([audio] * loops).subclip(0, 15))
+
+    _print_seconds("voiceover padded", _time_per_call(legacy_voice, 1), _time_per_call(lambda: mix(voice, None, 15), 3))
+    _print_seconds("music looped", _time_per_call(legacy_music, 1), _time_per_call(lambda: mix(None, music, 15), 3))
+    ducked = _time_per_call(lambda: mix(voice, music, 15), 3)
+    print(f"  {'voice over ducked music':<28} {ducked * 1000:9.2f} ms")
+
+
+BENCHMARKS = {
+    'backgrounds': bench_backgrounds,
+    'gradients': bench_gradients,
+    'animated_gradient': bench_animated_gradient,
+    'batch': bench_batch,
+    'particles': bench_particles,
+    'cards': bench_cards,
+    'parallel': bench_parallel,
+    'encoder': bench_encoder,
+    'holds': bench_holds,
+    'images': bench_images,
+    'kenburns': bench_kenburns,
+    'music': bench_music,
+    'audio': bench_audio,
+    'tts': bench_tts,
+    'mixer': bench_mixer,
+    'profiles': bench_profiles,
+}
+
+
+if __name__ == "__main__":
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        bench = BENCHMARKS[name]
+        print(f"{name}: {bench.__doc__}")
+        bench()
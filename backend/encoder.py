@@ -0,0 +1,506 @@
+import copy
+import os
+import subprocess
+import tempfile
+import threading
+import wave
+import numpy as np
+from contextlib import contextmanager
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
+from moviepy.audio.AudioClip import AudioClip
+from moviepy.config import get_setting
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+
+class EncoderSettings:
+    """x264/AAC options shared by every exporter.
+
+    Segment intermediates are only stream-copy compatible when they are
+    encoded with identical settings, so callers pass one instance around
+    instead of building ffmpeg arguments themselves.
+    """
+
+    def __init__(
+        self,
+        codec: str = 'libx264',
+        preset: str = 'medium',
+        crf: int = 23,
+        threads: Optional[int] = None,
+        tune: Optional[str] = None,
+        pix_fmt: str = 'yuv420p',
+        audio_codec: str = 'aac',
+        audio_bitrate: str = '128k'
+    ):
+        self.codec = codec
+        self.preset = preset
+        self.crf = crf
+        self.threads = threads
+        self.tune = tune
+        self.pix_fmt = pix_fmt
+        self.audio_codec = audio_codec
+        self.audio_bitrate = audio_bitrate
+
+    @classmethod
+    def from_env(cls) -> 'EncoderSettings':
+        """Settings from ENCODER_PRESET, ENCODER_CRF, ENCODER_THREADS and ENCODER_TUNE"""
+        threads = os.getenv("ENCODER_THREADS")
+        return cls(
+            preset=os.getenv("ENCODER_PRESET", "medium"),
+            crf=int(os.getenv("ENCODER_CRF", 23)),
+            threads=int(threads) if threads else None,
+            tune=os.getenv("ENCODER_TUNE") or None
+        )
+
+    def replace(self, **overrides) -> 'EncoderSettings':
+        """Copy of these settings with the given options changed"""
+        settings = copy.copy(self)
+        for name, value in overrides.items():
+            if not hasattr(settings, name):
+                raise AttributeError(f"Unknown encoder setting: {name}")
+            setattr(settings, name, value)
+        return settings
+
+    def video_args(self) -> List[str]:
+        args = ['-c:v', self.codec, '-preset', self.preset, '-crf', str(self.crf), '-pix_fmt', self.pix_fmt]
+        if self.tune:
+            args += ['-tune', self.tune]
+        if self.threads:
+            args += ['-threads', str(self.threads)]
+        return args
+
+    def audio_args(self) -> List[str]:
+        return ['-c:a', self.audio_codec, '-b:a', self.audio_bitrate]
+
+
+def ffmpeg_binary() -> str:
+    return get_setting("FFMPEG_BINARY")
+
+
+class PCMAudioClip(AudioClip):
+    """Audio clip backed by float32 PCM in memory, shape (samples,) or (samples, channels).
+
+    Unlike moviepy's AudioArrayClip it keeps mono as mono and reads samples
+    by index for arrays of times, and clip_audio_pcm hands the array to
+    ffmpeg as is while the clip is untransformed.
+    """
+
+    def __init__(self, pcm: np.ndarray, fps: int = 44100):
+        pcm = np.asarray(pcm, dtype=np.float32)
+        self.pcm = np.ascontiguousarray(pcm.reshape(len(pcm), -1))
+        super().__init__(self._frame, duration=len(pcm) / fps, fps=fps)
+
+    def _frame(self, t):
+        # Nearest sample, so times on the sample grid are not floored one sample early
+        index = np.rint(np.asarray(t) * self.fps).astype(np.int64)
+        in_range = (index >= 0) & (index < len(self.pcm))
+        frames = self.pcm[np.where(in_range, index, 0)]
+        return np.where(in_range[..., None], frames, 0)
+
+
+def audio_pcm(audio, fps: int = 44100) -> Optional[np.ndarray]:
+    """Return an audio clip's samples as float32 PCM, shape (samples, channels)"""
+    if audio is None:
+        return None
+    source = getattr(audio.make_frame, '__self__', None)
+    if isinstance(source, PCMAudioClip) and audio.make_frame.__func__ is PCMAudioClip._frame \
+            and source.fps == fps:
+        # Array-backed audio that no effect has wrapped: pass the samples straight through
+        samples = int(fps * audio.duration)
+        pcm = source.pcm[:samples]
+        if len(pcm) < samples:
+            pcm = np.pad(pcm, ((0, samples - len(pcm)), (0, 0)))
+        return pcm
+    # Collect the chunks ourselves: to_soundarray hands np.vstack a generator
+    chunks = list(audio.iter_chunks(fps=fps, quantize=False, chunksize=50000))
+    pcm = np.vstack([chunk if chunk.ndim == 2 else chunk[:, None] for chunk in chunks])
+    return np.ascontiguousarray(pcm, dtype=np.float32)
+
+
+def clip_audio_pcm(clip, fps: int = 44100) -> Optional[np.ndarray]:
+    """Return a clip's soundtrack as float32 PCM, shape (samples, channels)"""
+    if clip is None:
+        return None
+    return audio_pcm(getattr(clip, 'audio', None), fps)
+
+
+def decode_audio(source: Union[str, bytes], fps: int = 44100, channels: int = 1) -> np.ndarray:
+    """Decode an audio file (path or in-memory bytes) to float32 PCM, shape (samples, channels)"""
+    path, data = (source, None) if isinstance(source, str) else ('pipe:0', source)
+    result = subprocess.run(
+        [ffmpeg_binary(), '-v', 'error', '-i', path, '-f', 'f32le', '-ac', str(channels), '-ar', str(fps), 'pipe:1'],
+        input=data, capture_output=True, check=True
+    )
+    return np.frombuffer(result.stdout, dtype='<f4').reshape(-1, channels).astype(np.float32)
+
+
+@contextmanager
+def _audio_input(pcm: Optional[np.ndarray], fps: int):
+    """Yield (ffmpeg input args, fds to inherit, feeder thread) for a PCM buffer.
+
+    On POSIX the samples are streamed through an extra pipe fd so nothing
+    touches the disk. Windows cannot hand extra fds to a child process, so
+    there the samples go through a short-lived WAV file instead.
+    """
+    if pcm is None:
+        yield [], (), None
+        return
+
+    channels = pcm.shape[1]
+    if os.name == 'posix':
+        read_fd, write_fd = os.pipe()
+
+        def feed():
+            with os.fdopen(write_fd, 'wb') as pipe:
+                try:
+                    pipe.write(memoryview(pcm).cast('B'))
+                except BrokenPipeError:
+                    pass
+
+        feeder = threading.Thread(target=feed, daemon=True)
+        try:
+            yield (['-f', 'f32le', '-ar', str(fps), '-ac', str(channels), '-i', f'pipe:{read_fd}'],
+                   (read_fd,), feeder)
+        finally:
+            os.close(read_fd)
+            if feeder.is_alive():
+                feeder.join()
+        return
+
+    handle, wav_path = tempfile.mkstemp(suffix='.wav')
+    os.close(handle)
+    with wave.open(wav_path, 'w') as wav_file:
+        wav_file.setnchannels(channels)
+        wav_file.setsampwidth(2)
+        wav_file.setframerate(fps)
+        wav_file.writeframes((np.clip(pcm, -1, 1) * 32767).astype(np.int16).tobytes())
+    try:
+        yield ['-i', wav_path], (), None
+    finally:
+        os.remove(wav_path)
+
+
+class FFmpegWriter:
+    """Stream raw frames (and optional PCM audio) straight into an ffmpeg process.
+
+    Frames are written as rgb24, or converted to yuv420p with OpenCV before
+    they hit the pipe when input_format='yuv420p' (half the bytes per frame).
+    video_filter is passed to ffmpeg as -vf; with variable_frame_rate the
+    timestamps it sets are kept as they are instead of being filled in to a
+    constant rate. B-frames are turned off so the reordering delay cannot
+    shift the edit list over the long gaps between frames, and the movie
+    timescale is a whole multiple of fps so the edit list can end on an
+    exact frame boundary.
+    Use as a context manager or call close() to finalize the file.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        size: Tuple[int, int],
+        fps: float,
+        settings: Optional[EncoderSettings] = None,
+        audio: Optional[np.ndarray] = None,
+        audio_fps: int = 44100,
+        input_format: str = 'rgb24',
+        video_filter: Optional[str] = None,
+        variable_frame_rate: bool = False
+    ):
+        self.size = size
+        self.settings = settings or EncoderSettings()
+        self.input_format = input_format if cv2 is not None else 'rgb24'
+        width, height = size
+
+        self._audio = _audio_input(audio, audio_fps)
+        audio_args, pass_fds, self._feeder = self._audio.__enter__()
+
+        cmd = [ffmpeg_binary(), '-y', '-loglevel', 'error',
+               '-f', 'rawvideo', '-pix_fmt', self.input_format, '-s', f'{width}x{height}',
+               '-r', str(fps), '-i', 'pipe:0']
+        cmd += audio_args
+        if video_filter:
+            cmd += ['-vf', video_filter]
+        cmd += self.settings.video_args()
+        if variable_frame_rate:
+            # Whole ticks per frame in both timescales, so the edit list ends exactly on a frame
+            timescale = str(int(round(fps * 1000)))
+            cmd += ['-fps_mode', 'passthrough', '-bf', '0',
+                    '-video_track_timescale', timescale, '-movie_timescale', timescale]
+        if audio_args:
+            cmd += self.settings.audio_args()
+        cmd += ['-movflags', '+faststart', output_path]
+
+        self.proc = subprocess.Popen(cmd, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.PIPE, pass_fds=pass_fds)
+        if self._feeder is not None:
+            self._feeder.start()
+
+    def write_frame(self, frame: np.ndarray):
+        if self.input_format == 'yuv420p':
+            frame = cv2.cvtColor(frame, cv2.COLOR_RGB2YUV_I420)
+        try:
+            self.proc.stdin.write(memoryview(np.ascontiguousarray(frame, dtype=np.uint8)).cast('B'))
+        except BrokenPipeError:
+            self.close()
+
+    def close(self):
+        if self.proc is None:
+            return
+        proc, self.proc = self.proc, None
+        proc.stdin.close()
+        error = proc.stderr.read()
+        proc.wait()
+        self._audio.__exit__(None, None, None)
+        if proc.returncode != 0:
+            raise IOError(f"ffmpeg encoding failed: {error.decode(errors='replace').strip()}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def report_frames(
+    frames: Iterable[np.ndarray],
+    total: int,
+    progress: Optional[Callable[[float], None]],
+    every: int
+) -> Iterator[np.ndarray]:
+    """Pass frames through, calling progress with the fraction written every `every` frames"""
+    for count, frame in enumerate(frames, 1):
+        yield frame
+        if progress is not None and (count % every == 0 or count == total):
+            progress(min(1.0, count / max(total, 1)))
+
+
+def write_frames(
+    frames: Iterable[np.ndarray],
+    output_path: str,
+    size: Tuple[int, int],
+    fps: float,
+    settings: Optional[EncoderSettings] = None,
+    audio: Optional[np.ndarray] = None,
+    audio_fps: int = 44100
+) -> str:
+    """Encode an iterable of RGB frames (plus optional PCM audio) to output_path"""
+    with FFmpegWriter(output_path, size, fps, settings, audio, audio_fps) as writer:
+        for frame in frames:
+            writer.write_frame(frame)
+    return output_path
+
+
+def default_batch_bytes() -> int:
+    """Working-memory cap for batched frame rendering from RENDER_BATCH_MB, defaulting to 128 MB"""
+    return int(os.getenv("RENDER_BATCH_MB", 128)) * 1024 * 1024
+
+
+def batch_length(size: Tuple[int, int], bytes_per_pixel: int = 3, max_bytes: Optional[int] = None) -> int:
+    """Frames per batch so a batch's working set stays under max_bytes (at least one)"""
+    width, height = size
+    max_bytes = max_bytes or default_batch_bytes()
+    return max(1, max_bytes // (width * height * bytes_per_pixel))
+
+
+def iter_frame_batches(
+    renderer: Callable,
+    ts: np.ndarray,
+    size: Tuple[int, int],
+    max_bytes: Optional[int] = None
+) -> Iterator[np.ndarray]:
+    """Render ts through renderer.render_batch, yielding (N, height, width, 3) batches.
+
+    Every batch is rendered into the same preallocated buffer, so each one
+    is only valid until the next is requested. The batch length comes from
+    the renderer's batch_bytes_per_pixel (working memory per output pixel,
+    3 if unset) and max_bytes.
+    """
+    width, height = size
+    length = batch_length(size, getattr(renderer, 'batch_bytes_per_pixel', 3), max_bytes)
+    length = min(length, len(ts)) or 1
+    buffer = np.empty((length, height, width, 3), dtype=np.uint8)
+    for start in range(0, len(ts), length):
+        batch = ts[start:start + length]
+        yield renderer.render_batch(batch, out=buffer[:len(batch)])
+
+
+def write_batched(
+    renderer: Callable,
+    duration: float,
+    output_path: str,
+    fps: float,
+    size: Tuple[int, int],
+    settings: Optional[EncoderSettings] = None,
+    audio: Optional[np.ndarray] = None,
+    audio_fps: int = 44100,
+    max_bytes: Optional[int] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> str:
+    """Encode a renderer with render_batch, computing frames many at a time.
+
+    Frame times match clip.iter_frames, so the output is frame-for-frame
+    what write_clip would produce for mp.VideoClip(renderer). progress, if
+    given, is called with the fraction of frames written after each batch.
+    """
+    ts = np.arange(0, duration, 1.0 / fps)
+    written = 0
+    with FFmpegWriter(output_path, size, fps, settings, audio, audio_fps) as writer:
+        for frames in iter_frame_batches(renderer, ts, size, max_bytes):
+            for frame in frames:
+                writer.write_frame(frame)
+            written += len(frames)
+            if progress is not None:
+                progress(written / len(ts))
+    return output_path
+
+
+class StillSequence:
+    """make_frame for a slideshow of stills, each shown for its duration.
+
+    write_clip encodes it as one held frame per still instead of sending
+    the same pixels to the encoder for every output frame.
+    """
+
+    def __init__(self, frames: List[np.ndarray], durations: List[float]):
+        self.frames = frames
+        self.starts = np.cumsum([0.0] + list(durations[:-1]))
+
+    def _indices(self, ts) -> np.ndarray:
+        return np.maximum(np.searchsorted(self.starts, ts, side='right') - 1, 0)
+
+    def __call__(self, t: float) -> np.ndarray:
+        return self.frames[int(self._indices(t))]
+
+    def hold_runs(self, ts: np.ndarray) -> List[Tuple[np.ndarray, int]]:
+        """(still, frame count) for each still shown at the frame times ts"""
+        counts = np.bincount(self._indices(ts), minlength=len(self.frames))
+        return [(frame, int(count)) for frame, count in zip(self.frames, counts) if count]
+
+
+def hold_runs(clip, fps: float) -> Optional[List[Tuple[np.ndarray, int]]]:
+    """Runs of identical frames as (frame, frame count), for clips known to be stills.
+
+    ImageClips are one still (moviepy turns them into plain VideoClips as
+    soon as an effect could animate them), as are renderers flagged
+    is_static; renderers with a hold_runs(ts) method list their own runs.
+    Any other clip returns None and is encoded frame by frame.
+    """
+    from moviepy.editor import ImageClip
+
+    ts = np.arange(0, clip.duration, 1.0 / fps)
+    if not len(ts):
+        return None
+    if isinstance(clip, ImageClip):
+        return [(clip.img, len(ts))]
+    if getattr(clip.make_frame, 'is_static', False):
+        return [(clip.make_frame(0.0), len(ts))]
+    if hasattr(clip.make_frame, 'hold_runs'):
+        return clip.make_frame.hold_runs(ts)
+    return None
+
+
+def write_holds(
+    runs: List[Tuple[np.ndarray, int]],
+    output_path: str,
+    size: Tuple[int, int],
+    fps: float,
+    settings: Optional[EncoderSettings] = None,
+    audio: Optional[np.ndarray] = None,
+    audio_fps: int = 44100
+) -> str:
+    """Encode runs of (frame, frame count) as held frames.
+
+    Each frame is piped once and setpts moves it to the output frame it
+    starts at, so x264 encodes one picture per run instead of one per
+    output frame. The file is variable frame rate: a closing copy at the
+    end time gives the last run its full duration (the muxer trims it off
+    with the edit list), and the first three output frames are piped one
+    by one even when they repeat, so players that guess the rate from the
+    first timestamps (MoviePy reads ffmpeg's tbr) see the real fps.
+    """
+    frames, starts = [], []
+    total = 0
+    for frame, count in runs:
+        # The first three output frames are always piped, repeats included
+        for start in range(total, min(total + count, 3) if total < 3 else total + 1):
+            frames.append(frame)
+            starts.append(start)
+        total += count
+    frames.append(frames[-1])
+    starts.append(total)
+
+    # Frame N of the pipe starts at output frame starts[N]
+    expression = str(starts[-1])
+    for n in range(len(starts) - 2, -1, -1):
+        expression = f"if(lt(N,{n + 1}),{starts[n]},{expression})"
+    video_filter = f"setpts='({expression})/({fps}*TB)'"
+
+    with FFmpegWriter(output_path, size, fps, settings, audio, audio_fps,
+                      video_filter=video_filter, variable_frame_rate=True) as writer:
+        for frame in frames:
+            writer.write_frame(frame)
+    return output_path
+
+
+def write_clip(
+    clip,
+    output_path: str,
+    fps: float,
+    settings: Optional[EncoderSettings] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> str:
+    """Drop-in replacement for clip.write_videofile without the temp audio file.
+
+    Clips that are known to be stills are encoded as held frames (see
+    hold_runs). Clips made directly from a renderer with render_batch (and
+    not since wrapped by an effect) are rendered in batches instead of
+    frame by frame. progress, if given, is called with the fraction of
+    frames written, per batch or once per second of video.
+    """
+    runs = hold_runs(clip, fps)
+    if runs is not None:
+        write_holds(runs, output_path, tuple(clip.size), fps, settings, clip_audio_pcm(clip))
+        if progress is not None:
+            progress(1.0)
+        return output_path
+    if hasattr(clip.make_frame, 'render_batch'):
+        return write_batched(clip.make_frame, clip.duration, output_path, fps, tuple(clip.size),
+                             settings, clip_audio_pcm(clip), progress=progress)
+    frames = clip.iter_frames(fps=fps, dtype='uint8')
+    frames = report_frames(frames, int(clip.duration * fps), progress, max(1, int(fps)))
+    return write_frames(frames, output_path, tuple(clip.size), fps, settings, clip_audio_pcm(clip))
+
+
+def concat_files(
+    paths: List[str],
+    output_path: str,
+    settings: Optional[EncoderSettings] = None,
+    audio: Optional[np.ndarray] = None,
+    audio_fps: int = 44100
+) -> str:
+    """Join identically encoded files with the concat demuxer (video is stream-copied)"""
+    settings = settings or EncoderSettings()
+    handle, list_path = tempfile.mkstemp(suffix='.txt', text=True)
+    with os.fdopen(handle, 'w') as f:
+        for path in paths:
+            f.write(f"file '{os.path.abspath(path)}'\n")
+
+    try:
+        with _audio_input(audio, audio_fps) as (audio_args, pass_fds, feeder):
+            cmd = [ffmpeg_binary(), '-y', '-loglevel', 'error', '-f', 'concat', '-safe', '0', '-i', list_path]
+            if audio_args:
+                cmd += audio_args + ['-map', '0:v', '-map', '1:a'] + settings.audio_args()
+            cmd += ['-c:v', 'copy', '-movflags', '+faststart', output_path]
+            proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, pass_fds=pass_fds)
+            if feeder is not None:
+                feeder.start()
+            error = proc.communicate()[1]
+            if proc.returncode != 0:
+                raise IOError(f"ffmpeg concat failed: {error.decode(errors='replace').strip()}")
+    finally:
+        os.remove(list_path)
+
+    return output_path
@@ -0,0 +1,71 @@
+import os
+from functools import lru_cache
+from typing import Optional, Tuple
+
+from PIL import ImageFont
+
+# Tried in order after FONT_PATH; Pillow also searches the system font directories
+FONT_CANDIDATES = ("arial.ttf", "Arial.ttf", "DejaVuSans.ttf", "LiberationSans-Regular.ttf")
+
+
+@lru_cache(maxsize=None)
+def font_path() -> Optional[str]:
+    """First loadable TrueType font from FONT_PATH and FONT_CANDIDATES, or None"""
+    configured = os.getenv("FONT_PATH")
+    for candidate in ((configured,) if configured else ()) + FONT_CANDIDATES:
+        try:
+            ImageFont.truetype(candidate, 10)
+        except OSError:
+            continue
+        return candidate
+    return None
+
+
+@lru_cache(maxsize=64)
+def get_font(size: int) -> ImageFont.ImageFont:
+    """Shared font at a pixel size, loaded once per process"""
+    path = font_path()
+    if path:
+        return ImageFont.truetype(path, size)
+    try:
+        # Pillow >= 10.1 ships a scalable default font
+        return ImageFont.load_default(size)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def preload_fonts() -> Optional[str]:
+    """Resolve the font fallback chain up front and report which font is used"""
+    path = font_path()
+    print(f"Using font: {path or 'Pillow default'}")
+    return path
+
+
+@lru_cache(maxsize=1024)
+def wrap_words(text: str, max_chars: int) -> Tuple[str, ...]:
+    """Greedy word wrap to lines of at most max_chars (longer words get their own line)"""
+    lines = []
+    current_line = []
+    for word in text.split():
+        current_line.append(word)
+        if len(' '.join(current_line)) > max_chars:
+            if len(current_line) > 1:
+                lines.append(' '.join(current_line[:-1]))
+                current_line = [word]
+            else:
+                lines.append(word)
+                current_line = []
+    if current_line:
+        lines.append(' '.join(current_line))
+    return tuple(lines)
+
+
+@lru_cache(maxsize=4096)
+def text_bbox(text: str, font: ImageFont.ImageFont) -> Tuple[int, int, int, int]:
+    """Bounding box of text drawn at the origin, same as draw.textbbox((0, 0), text, font=font)"""
+    return font.getbbox(text)
+
+
+def text_width(text: str, font: ImageFont.ImageFont) -> int:
+    left, _, right, _ = text_bbox(text, font)
+    return right - left
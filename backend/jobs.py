@@ -0,0 +1,405 @@
+import asyncio
+import json
+import os
+import queue
+import signal
+import time
+import uuid
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+from parallel_render import _pool_context, default_render_workers
+from render_cache import RenderCache, request_key
+
+QUEUED, RUNNING, COMPLETED, FAILED, CANCELLED = 'queued', 'running', 'completed', 'failed', 'cancelled'
+FINISHED_STATES = (COMPLETED, FAILED, CANCELLED)
+
+
+def default_job_workers() -> int:
+    """Concurrent render jobs from JOB_WORKERS, defaulting to 2"""
+    return int(os.getenv("JOB_WORKERS", 2)) or 1
+
+
+def default_lock_dir() -> Optional[str]:
+    """Directory for cross-process render locks from RENDER_LOCK_DIR (unset disables them)"""
+    return os.getenv("RENDER_LOCK_DIR") or None
+
+
+@contextmanager
+def _render_lock(lock_dir: Optional[str], key: str):
+    """Serialize identical renders across API processes with an advisory file lock.
+
+    Yields (output of an identical render that finished while we waited,
+    marker path to record our own result in). Both are None when locking
+    is disabled or unsupported on this platform.
+    """
+    if not lock_dir or fcntl is None:
+        yield None, None
+        return
+
+    os.makedirs(lock_dir, exist_ok=True)
+    marker_path = os.path.join(lock_dir, f"{key}.json")
+    waiting_since = time.time()
+    with open(os.path.join(lock_dir, f"{key}.lock"), 'a') as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            shared_output = None
+            try:
+                with open(marker_path) as f:
+                    marker = json.load(f)
+                if marker["finished_at"] >= waiting_since and os.path.exists(marker["path"]):
+                    shared_output = marker["path"]
+            except (OSError, ValueError, KeyError):
+                pass
+            yield shared_output, marker_path
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _run_job(request: Dict, render_workers: int, events, key: str, lock_dir: Optional[str] = None):
+    """Job process entry point: render one reel and report back through events"""
+    from ai_content_generator import AIContentGenerator
+
+    # Lead a process group so cancelling also stops render workers and ffmpeg
+    if hasattr(os, 'setpgrp'):
+        os.setpgrp()
+
+    stages = []
+
+    def report(stage: str, fraction: float):
+        stages.append(stage)
+        events.put(('progress', stage, fraction))
+
+    try:
+        report('waiting', 0.0)
+        with _render_lock(lock_dir, key) as (shared_output, marker_path):
+            if shared_output:
+                events.put(('completed', shared_output))
+                return
+
+            generator = AIContentGenerator(render_workers=render_workers)
+            output_path = asyncio.run(generator.generate_reel(**request, progress_callback=report))
+            if marker_path and 'fallback' not in stages:
+                with open(marker_path, 'w') as f:
+                    json.dump({"path": output_path, "finished_at": time.time()}, f)
+        events.put(('completed', output_path))
+    except Exception as e:
+        events.put(('failed', str(e)))
+
+
+class Job:
+    """State of one render request as seen by the API"""
+
+    def __init__(self, job_id: str, request: Dict):
+        self.id = job_id
+        self.request = request
+        self.state = QUEUED
+        self.stage = QUEUED
+        self.progress = 0.0
+        self.output_path: Optional[str] = None
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.cache_key: Optional[str] = None
+        self.cached = False
+        # Set when the job joined a render another request had already started
+        self.coalesced = False
+        self.done = asyncio.Event()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINISHED_STATES
+
+    def finish(self, state: str, error: Optional[str] = None):
+        self.state = state
+        self.stage = state
+        self.error = error
+        self.finished_at = time.time()
+        if state == COMPLETED:
+            self.progress = 1.0
+        self.done.set()
+
+    def to_dict(self) -> Dict:
+        return {
+            "id": self.id,
+            "state": self.state,
+            "stage": self.stage,
+            "progress": round(self.progress, 3),
+            "prompt": self.request.get("prompt"),
+            "quality": self.request.get("quality"),
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "cached": self.cached,
+            "coalesced": self.coalesced,
+            "video_path": self.output_path if self.state == COMPLETED else None,
+            "download_url": f"/outputs/{os.path.basename(self.output_path)}"
+            if self.state == COMPLETED else None
+        }
+
+
+class _Flight:
+    """One render shared by every job that asked for the same request"""
+
+    def __init__(self, key: str, request: Dict):
+        self.key = key
+        self.request = request
+        self.jobs: List[Job] = []
+        self.process = None
+        self.task: Optional[asyncio.Task] = None
+        # Set when the generator gave up and rendered its fallback reel
+        self.fallback = False
+
+    def update(self, stage: str, progress: float):
+        for job in self.jobs:
+            job.stage, job.progress = stage, progress
+
+    def start(self):
+        for job in self.jobs:
+            job.state = RUNNING
+            job.stage = 'starting'
+            job.started_at = time.time()
+
+    def finish(self, state: str, error: Optional[str] = None, output_path: Optional[str] = None):
+        for job in self.jobs:
+            job.output_path = output_path
+            job.finish(state, error)
+
+
+class JobManager:
+    """Run reel renders in a bounded set of worker processes.
+
+    Each render gets its own process so it can be cancelled by terminating
+    it; at most max_workers of them run at once and the rest wait in FIFO
+    order. The event loop only polls render processes for progress
+    messages, so API requests stay responsive while reels render.
+
+    Requests are single-flight: a job whose request key matches a render
+    that is already queued or running subscribes to that render instead of
+    starting another one, and cancelling a job only stops the render once
+    no other job is waiting on it. With a lock_dir, identical renders are
+    also serialized across API processes and reuse each other's output.
+    Finished jobs are kept for status queries up to history_size entries,
+    and the render cache will not evict a reel while one of them refers to it.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        history_size: int = 256,
+        output_dir: str = "../outputs",
+        poll_interval: float = 0.2,
+        cache: Optional[RenderCache] = None,
+        lock_dir: Optional[str] = None
+    ):
+        self.max_workers = max_workers or default_job_workers()
+        self.history_size = history_size
+        self.output_dir = output_dir
+        self.poll_interval = poll_interval
+        self.cache = cache
+        self.lock_dir = lock_dir or default_lock_dir()
+        # Split the cores between concurrent jobs instead of oversubscribing
+        self.render_workers = max(1, default_render_workers() // self.max_workers)
+        self.jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self.coalesced = 0
+        self._flights: Dict[str, _Flight] = {}
+        self._slots = asyncio.Semaphore(self.max_workers)
+        self._context = _pool_context()
+
+    def submit(self, request: Dict, asset_digests: Optional[List[str]] = None) -> Job:
+        """Queue a render; request holds AIContentGenerator.generate_reel keyword arguments.
+
+        Requests already in the render cache complete immediately, and
+        requests identical to an unfinished render join it. asset_digests
+        are the upload hashes, if the caller already computed them.
+        """
+        job_id = uuid.uuid4().hex
+        request = dict(request)
+        request.setdefault("output_path", os.path.join(self.output_dir, f"reel_{job_id}.mp4"))
+        job = Job(job_id, request)
+        job.cache_key = request_key(request, asset_digests)
+        self.jobs[job_id] = job
+        self._prune()
+
+        if self.cache is not None:
+            cached_path = self.cache.get(job.cache_key)
+            if cached_path:
+                job.output_path = cached_path
+                job.cached = True
+                job.finish(COMPLETED)
+                if self.cache.hold(cached_path):
+                    # Tell other processes before they can evict it, off the event loop
+                    asyncio.get_running_loop().run_in_executor(None, self.cache.flush)
+                return job
+
+        flight = self._flights.get(job.cache_key)
+        if flight is not None:
+            job.coalesced = True
+            self.coalesced += 1
+            if flight.process is not None:
+                job.state, job.started_at = RUNNING, time.time()
+                job.stage, job.progress = flight.jobs[0].stage, flight.jobs[0].progress
+            flight.jobs.append(job)
+            return job
+
+        flight = _Flight(job.cache_key, request)
+        flight.jobs.append(job)
+        self._flights[flight.key] = flight
+        flight.task = asyncio.get_running_loop().create_task(self._run(flight))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.jobs.get(job_id)
+
+    async def wait(self, job_id: str) -> Job:
+        job = self.jobs[job_id]
+        await job.done.wait()
+        return job
+
+    def cancel(self, job_id: str) -> Optional[Job]:
+        """Cancel a queued or running job; finished jobs are returned unchanged"""
+        job = self.jobs.get(job_id)
+        if job is None or job.finished:
+            return job
+
+        job.finish(CANCELLED)
+        flight = self._flights.get(job.cache_key)
+        if flight is None or job not in flight.jobs:
+            return job
+        flight.jobs.remove(job)
+        if flight.jobs:
+            # Other requests still want this render
+            return job
+
+        # Nobody is waiting any more: stop the render, and let an identical
+        # request that arrives now start afresh
+        self._retire(flight)
+        if flight.process is not None:
+            if flight.process.is_alive():
+                self._terminate(flight.process)
+        elif flight.task is not None:
+            # Still waiting for a slot
+            flight.task.cancel()
+        return job
+
+    def stats(self) -> Dict:
+        counts = {state: 0 for state in (QUEUED, RUNNING) + FINISHED_STATES}
+        for job in self.jobs.values():
+            counts[job.state] += 1
+        return {
+            "max_workers": self.max_workers,
+            "renders_in_flight": len(self._flights),
+            "coalesced": self.coalesced,
+            "jobs": counts
+        }
+
+    def shutdown(self):
+        """Terminate every render process (used when the API shuts down)"""
+        for job in list(self.jobs.values()):
+            if not job.finished:
+                self.cancel(job.id)
+
+    async def _run(self, flight: _Flight):
+        try:
+            async with self._slots:
+                if not flight.jobs:
+                    return
+                await self._run_process(flight)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._retire(flight)
+
+    async def _run_process(self, flight: _Flight):
+        events = self._context.Queue()
+        process = self._context.Process(
+            target=_run_job,
+            args=(flight.request, self.render_workers, events, flight.key, self.lock_dir),
+            daemon=False
+        )
+        flight.process = process
+        flight.start()
+        process.start()
+
+        try:
+            while True:
+                self._drain(flight, events)
+                if not flight.jobs or not process.is_alive():
+                    break
+                await asyncio.sleep(self.poll_interval)
+
+            await asyncio.get_running_loop().run_in_executor(None, process.join)
+            self._drain(flight, events)
+            if flight.jobs and not flight.jobs[0].finished:
+                self._retire(flight)
+                flight.finish(FAILED, f"Render process exited with code {process.exitcode}")
+            if not flight.jobs:
+                # Every job was cancelled; drop the partial output
+                self._remove_partial_output(flight)
+        finally:
+            events.close()
+            events.join_thread()
+
+    def _drain(self, flight: _Flight, events):
+        while True:
+            try:
+                event = events.get_nowait()
+            except queue.Empty:
+                return
+            if not flight.jobs:
+                continue
+            kind = event[0]
+            if kind == 'progress':
+                flight.update(event[1], event[2])
+                flight.fallback = flight.fallback or event[1] == 'fallback'
+            elif kind == 'completed':
+                self._retire(flight)
+                flight.finish(COMPLETED, output_path=event[1])
+                if self.cache is not None:
+                    for _ in flight.jobs:
+                        self.cache.hold(event[1])
+                    if not flight.fallback:
+                        # Indexing takes a file lock other processes may hold
+                        asyncio.get_running_loop().run_in_executor(None, self.cache.put, flight.key, event[1])
+            elif kind == 'failed':
+                self._retire(flight)
+                flight.finish(FAILED, event[1])
+
+    def _retire(self, flight: _Flight):
+        """Stop routing new requests to a flight that has finished"""
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+
+    def _terminate(self, process):
+        try:
+            if hasattr(os, 'killpg'):
+                os.killpg(process.pid, signal.SIGTERM)
+                return
+        except (ProcessLookupError, PermissionError):
+            # The process has not become a group leader yet
+            pass
+        process.terminate()
+
+    def _remove_partial_output(self, flight: _Flight):
+        path = flight.request.get("output_path")
+        if path and os.path.exists(path):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def _prune(self):
+        finished = [job_id for job_id, job in self.jobs.items() if job.finished]
+        for job_id in finished[:max(0, len(finished) - self.history_size)]:
+            job = self.jobs.pop(job_id)
+            if self.cache is not None and job.state == COMPLETED:
+                # Its download URL is no longer handed out
+                self.cache.release(job.output_path)
@@ -0,0 +1,215 @@
+import copy
+import re
+import numpy as np
+from PIL import Image, ImageDraw, ImageFont
+from functools import lru_cache
+from typing import Callable, List, Optional, Tuple
+
+from fonts import wrap_words
+
+
+class Sprite:
+    """Pre-rasterized RGBA layer, cropped to its visible pixels.
+
+    x and y are the offset of the cropped pixels from the anchor the sprite
+    was drawn against, so compositing at an anchor reproduces the original
+    placement. Color is stored premultiplied so blending is one multiply-add.
+    """
+
+    def __init__(self, rgba: np.ndarray, x: int = 0, y: int = 0):
+        alpha = rgba[..., 3:4].astype(np.uint16)
+        self.x = x
+        self.y = y
+        self.height, self.width = rgba.shape[:2]
+        # +127 rounds the later division by 255 to nearest
+        self.premultiplied = rgba[..., :3].astype(np.uint16) * alpha + 127
+        self.inverse_alpha = 255 - alpha
+
+
+def rasterize(width: int, height: int, draw_fn: Callable[[ImageDraw.ImageDraw], None]) -> Optional[Sprite]:
+    """Draw onto a transparent canvas once and return the visible part as a sprite"""
+    canvas = Image.new('RGBA', (width, height), (0, 0, 0, 0))
+    draw_fn(ImageDraw.Draw(canvas))
+    bbox = canvas.getbbox()
+    if bbox is None:
+        return None
+    return Sprite(np.array(canvas.crop(bbox)), bbox[0], bbox[1])
+
+
+@lru_cache(maxsize=1024)
+def text_sprite(
+    text: str,
+    font: ImageFont.ImageFont,
+    fill,
+    shadow_fill=None,
+    shadow_offset: int = 2
+) -> Optional[Sprite]:
+    """Rasterize a line of text (with optional drop shadow) anchored at its draw origin.
+
+    Sprites are cached per (text, font, colors, offset); fonts come from the
+    fonts registry, so the same line is only rasterized once per process.
+    """
+    left, top, right, bottom = font.getbbox(text)
+    origin_x, origin_y = max(0, -left), max(0, -top)
+    pad = shadow_offset if shadow_fill else 0
+
+    def draw_text(draw):
+        if shadow_fill:
+            draw.text((origin_x + pad, origin_y + pad), text, font=font, fill=shadow_fill)
+        draw.text((origin_x, origin_y), text, font=font, fill=fill)
+
+    sprite = rasterize(right + origin_x + pad + 1, bottom + origin_y + pad + 1, draw_text)
+    if sprite is not None:
+        sprite.x -= origin_x
+        sprite.y -= origin_y
+    return sprite
+
+
+def clip_sprite(clip) -> Optional[Sprite]:
+    """Capture a static moviepy clip (e.g. a TextClip) and its mask as a sprite"""
+    rgb = clip.get_frame(0)
+    if clip.mask is not None:
+        alpha = clip.mask.get_frame(0) * 255
+    else:
+        alpha = np.full(rgb.shape[:2], 255)
+    rgba = np.dstack([rgb, alpha]).astype(np.uint8)
+    return Sprite(rgba)
+
+
+def tint(sprite: Optional[Sprite], color) -> Optional[Sprite]:
+    """Copy of a sprite recolored to a single RGB color, keeping its alpha"""
+    if sprite is None:
+        return None
+    tinted = copy.copy(sprite)
+    alpha = 255 - sprite.inverse_alpha
+    tinted.premultiplied = alpha * np.asarray(color, dtype=np.uint16) + 127
+    return tinted
+
+
+def composite(
+    frame: np.ndarray,
+    sprite: Optional[Sprite],
+    x: int = 0,
+    y: int = 0,
+    max_width: Optional[int] = None
+):
+    """Alpha-blend a sprite into an RGB uint8 frame in place, clipped to the frame.
+
+    With max_width, only the part of the sprite less than max_width pixels
+    right of the anchor is drawn.
+    """
+    if sprite is None:
+        return
+    left, top = x + sprite.x, y + sprite.y
+    x0, y0 = max(left, 0), max(top, 0)
+    x1 = min(left + sprite.width, frame.shape[1])
+    if max_width is not None:
+        x1 = min(x1, x + max_width)
+    y1 = min(top + sprite.height, frame.shape[0])
+    if x0 >= x1 or y0 >= y1:
+        return
+
+    src = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+    region = frame[y0:y1, x0:x1]
+    blended = sprite.premultiplied[src] + region * sprite.inverse_alpha[src]
+    region[...] = blended // 255
+
+
+class CenteredOverlay:
+    """Picklable make_frame drawing a static sprite centered over a batched background.
+
+    Forwards render_batch, so clips built from it still take the encoder's
+    batched path instead of a per-frame CompositeVideoClip.
+    """
+
+    def __init__(self, background, sprite: Optional[Sprite]):
+        self.background = background
+        self.sprite = sprite
+        self.width = background.width
+        self.height = background.height
+
+    def render_batch(self, ts, out: np.ndarray = None) -> np.ndarray:
+        """Render a batch of background frames with the sprite composited in place"""
+        out = self.background.render_batch(ts, out)
+        if self.sprite is not None:
+            x = (self.width - self.sprite.width) // 2
+            y = (self.height - self.sprite.height) // 2
+            for frame in out:
+                composite(frame, self.sprite, x, y)
+        return out
+
+    def frame(self, t: float) -> np.ndarray:
+        """Render a single frame, shape (height, width, 3)"""
+        return self.render_batch([t])[0]
+
+    __call__ = frame
+
+
+class TypewriterText:
+    """Progressive reveal of wrapped text, laid out once for the full text.
+
+    Lines are wrapped and rasterized for the complete text, and for every
+    character count the number of visible lines and the pixel width shown
+    of the last one are precomputed. A frame then blits at most max_lines
+    cached sprites, and words never jump between lines as they appear.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        font: ImageFont.ImageFont,
+        max_chars: int,
+        fill='white',
+        shadow_fill=None,
+        shadow_offset: int = 2,
+        max_lines: Optional[int] = None
+    ):
+        self.text = text
+        self.lines = wrap_words(text, max_chars)[:max_lines]
+        self.sprites = [text_sprite(line, font, fill, shadow_fill=shadow_fill, shadow_offset=shadow_offset)
+                        for line in self.lines]
+
+        # (start, end) of every word in the original text, assigned to lines in order
+        words = [(match.start(), match.end()) for match in re.finditer(r'\S+', text)]
+        line_words = []
+        for line in self.lines:
+            count = len(line.split())
+            line_words.append(words[:count])
+            words = words[count:]
+
+        self._visible_lines = [0] * (len(text) + 1)
+        self._clip_widths: List[Optional[int]] = [None] * (len(text) + 1)
+        for chars in range(len(text) + 1):
+            started = [i for i, spans in enumerate(line_words) if spans and spans[0][0] < chars]
+            if not started:
+                continue
+            last = started[-1]
+            self._visible_lines[chars] = last + 1
+            columns = self._revealed_columns(line_words[last], chars)
+            if columns < len(self.lines[last]):
+                self._clip_widths[chars] = int(round(font.getlength(self.lines[last][:columns])))
+
+    @staticmethod
+    def _revealed_columns(spans: List[Tuple[int, int]], chars: int) -> int:
+        """Characters of a line (words joined by single spaces) shown after chars of the text"""
+        columns = 0
+        for index, (start, end) in enumerate(spans):
+            offset = columns + (1 if index else 0)
+            if chars >= end:
+                columns = offset + end - start
+            elif chars > start:
+                return offset + chars - start
+            else:
+                break
+        return columns
+
+    def visible_lines(self, chars: int) -> int:
+        """Number of lines with at least one character shown"""
+        return self._visible_lines[max(0, min(chars, len(self.text)))]
+
+    def spans(self, chars: int) -> List[Tuple[int, Optional[Sprite], Optional[int]]]:
+        """(line index, sprite, max_width or None if whole) for each line to draw"""
+        chars = max(0, min(chars, len(self.text)))
+        count = self._visible_lines[chars]
+        return [(i, self.sprites[i], self._clip_widths[chars] if i == count - 1 else None)
+                for i in range(count)]
@@ -1,15 +1,18 @@
-from fastapi import FastAPI, File, UploadFile, Form, HTTPException
+from fastapi import FastAPI, File, UploadFile, Form, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 import uvicorn
 import os
 from dotenv import load_dotenv
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 import json
 
-from ai_content_generator import AIContentGenerator
+from jobs import COMPLETED, JobManager
+from render_cache import RenderCache
+from uploads import UploadStore, UploadTooLarge
 from trend_analyzer import TrendAnalyzer
+from render_profiles import DEFAULT_QUALITY, PROFILES
 
 load_dotenv()
 
@@ -31,13 +34,123 @@ app.mount("/static", StaticFiles(directory="../static"), name="static")
 app.mount("/outputs", StaticFiles(directory="../outputs"), name="outputs")
 
 # Initialize components
-video_generator = AIContentGenerator()
+render_cache = RenderCache("../outputs")
+upload_store = UploadStore("../uploads")
+job_manager = JobManager(cache=render_cache)
 trend_analyzer = TrendAnalyzer()
 
+@app.middleware("http")
+async def limit_upload_size(request: Request, call_next):
+    """Reject oversized upload requests before the form is parsed"""
+    if request.method == "POST" and request.url.path in ("/generate-reel", "/jobs"):
+        content_length = request.headers.get("content-length")
+        # Allow some room for the multipart framing and text fields
+        limit = upload_store.max_request_bytes + 1024 * 1024
+        if content_length and content_length.isdigit() and int(content_length) > limit:
+            return JSONResponse(
+                status_code=413,
+                content={"detail": f"Uploads are larger than {upload_store.max_request_bytes // (1024 * 1024)} MB in total"}
+            )
+    return await call_next(request)
+
 @app.get("/")
 async def root():
     return {"message": "AI Reel Generator API", "version": "1.0.0"}
 
+@app.on_event("shutdown")
+async def shutdown_jobs():
+    job_manager.shutdown()
+
+async def _build_render_request(
+    prompt: str,
+    style: str,
+    duration: int,
+    images: List[UploadFile],
+    audio: Optional[UploadFile],
+    include_trending: bool,
+    quality: str
+) -> Tuple[Dict, List[str]]:
+    """Validate the form, save uploads and collect generate_reel arguments and upload hashes"""
+    # Profile names are case-insensitive; keep one spelling so the render cache key matches
+    quality = quality.lower()
+    if quality not in PROFILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unknown quality '{quality}', expected one of: {', '.join(PROFILES)}"
+        )
+    
+    # Stream uploaded files to the content-addressed upload store
+    has_audio = bool(audio and audio.filename)
+    uploads = [img for img in images if img.filename] + ([audio] if has_audio else [])
+    try:
+        stored = await upload_store.save_all(uploads)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Failed to save uploads: {e}")
+    
+    stored_images = stored[:-1] if has_audio else stored
+    image_paths = [item.path for item in stored_images]
+    audio_path = stored[-1].path if has_audio else None
+    
+    # Get trending data if requested
+    trending_data = None
+    if include_trending:
+        trending_data = await trend_analyzer.get_trending_data()
+    
+    return {
+        "prompt": prompt,
+        "style": style,
+        "duration": duration,
+        "image_paths": image_paths,
+        "audio_path": audio_path,
+        "trending_data": trending_data,
+        "quality": quality
+    }, [item.digest for item in stored]
+
+@app.post("/jobs", status_code=202)
+async def create_job(
+    prompt: str = Form(...),
+    style: str = Form(default="trendy"),
+    duration: int = Form(default=15),
+    images: List[UploadFile] = File(default=[]),
+    audio: Optional[UploadFile] = File(default=None),
+    include_trending: bool = Form(default=True),
+    quality: str = Form(default=DEFAULT_QUALITY)
+):
+    """Queue a reel render and return its job id immediately"""
+    request, asset_digests = await _build_render_request(
+        prompt, style, duration, images, audio, include_trending, quality
+    )
+    try:
+        job = job_manager.submit(request, asset_digests)
+        return job.to_dict()
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@app.get("/jobs")
+async def get_job_stats():
+    """Get job counts by state and how many requests joined an in-flight render"""
+    return job_manager.stats()
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get the state, progress and result of a render job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job.to_dict()
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str):
+    """Cancel a queued or running render job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if job.finished:
+        raise HTTPException(status_code=409, detail=f"Job already {job.state}")
+    return job_manager.cancel(job_id).to_dict()
+
 @app.post("/generate-reel")
 async def generate_reel(
     prompt: str = Form(...),
@@ -45,49 +158,31 @@ async def generate_reel(
     duration: int = Form(default=15),
     images: List[UploadFile] = File(default=[]),
     audio: Optional[UploadFile] = File(default=None),
-    include_trending: bool = Form(default=True)
+    include_trending: bool = Form(default=True),
+    quality: str = Form(default=DEFAULT_QUALITY)
 ):
-    """Generate a reel based on prompt and optional media"""
+    """Generate a reel based on prompt and optional media (waits for the render job)"""
+    request, asset_digests = await _build_render_request(
+        prompt, style, duration, images, audio, include_trending, quality
+    )
     try:
-        # Save uploaded files
-        os.makedirs("../uploads", exist_ok=True)
-        image_paths = []
-        for img in images:
-            if img.filename:
-                img_path = f"../uploads/{img.filename}"
-                with open(img_path, "wb") as f:
-                    f.write(await img.read())
-                image_paths.append(img_path)
-        
-        audio_path = None
-        if audio and audio.filename:
-            audio_path = f"../uploads/{audio.filename}"
-            with open(audio_path, "wb") as f:
-                f.write(await audio.read())
-        
-        # Get trending data if requested
-        trending_data = None
-        if include_trending:
-            trending_data = await trend_analyzer.get_trending_data()
-        
-        # Generate the reel
-        output_path = await video_generator.generate_reel(
-            prompt=prompt,
-            style=style,
-            duration=duration,
-            image_paths=image_paths,
-            audio_path=audio_path,
-            trending_data=trending_data
-        )
-        
-        return {
-            "success": True,
-            "video_path": output_path,
-            "download_url": f"/outputs/{os.path.basename(output_path)}"
-        }
-        
+        job = job_manager.submit(request, asset_digests)
+        job = await job_manager.wait(job.id)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if job.state != COMPLETED:
+        raise HTTPException(status_code=500, detail=job.error or f"Render {job.state}")
+    
+    return {
+        "success": True,
+        "job_id": job.id,
+        "cached": job.cached,
+        "coalesced": job.coalesced,
+        "quality": quality,
+        "video_path": job.output_path,
+        "download_url": f"/outputs/{os.path.basename(job.output_path)}"
+    }
 
 @app.get("/trends")
 async def get_trends():
@@ -112,6 +207,28 @@ async def get_styles():
         ]
     }
 
+@app.get("/qualities")
+async def get_qualities():
+    """Get available render quality profiles"""
+    return {
+        "default": DEFAULT_QUALITY,
+        "qualities": [
+            {
+                "id": profile.name,
+                "width": profile.width,
+                "height": profile.height,
+                "fps": profile.fps,
+                "description": profile.description
+            }
+            for profile in PROFILES.values()
+        ]
+    }
+
+@app.get("/cache")
+async def get_cache_stats():
+    """Get render cache size and hit/miss counters"""
+    return render_cache.stats()
+
 @app.delete("/cleanup")
 async def cleanup_files():
     """Clean up temporary files"""
@@ -0,0 +1,111 @@
+from typing import Optional
+
+import numpy as np
+
+from music import SAMPLE_RATE
+
+# Music level under a voiceover, and how far it dips further while the voice speaks
+MUSIC_UNDER_VOICE = 0.35
+DUCK_DEPTH = 0.4
+
+
+def _as_2d(pcm: np.ndarray) -> np.ndarray:
+    pcm = np.asarray(pcm, dtype=np.float32)
+    return pcm.reshape(len(pcm), -1)
+
+
+def fit_length(pcm: np.ndarray, samples: int, loop: bool = False) -> np.ndarray:
+    """PCM trimmed to exactly samples, padded with silence or, with loop, repeated"""
+    pcm = _as_2d(pcm)
+    if len(pcm) >= samples:
+        return pcm[:samples]
+    if loop and len(pcm):
+        return np.resize(pcm, (samples, pcm.shape[1]))
+    return np.pad(pcm, ((0, samples - len(pcm)), (0, 0)))
+
+
+def _moving_average(values: np.ndarray, width: int, ahead: bool) -> np.ndarray:
+    """Mean over width values ending at (ahead=False) or starting at (ahead=True) each position"""
+    if width <= 1:
+        return values
+    padding = (0, width - 1) if ahead else (width - 1, 0)
+    return np.convolve(np.pad(values, padding, mode='edge'), np.full(width, 1.0 / width), mode='valid')
+
+
+def duck_gains(
+    voice: np.ndarray,
+    samples: int,
+    sample_rate: int = SAMPLE_RATE,
+    depth: float = DUCK_DEPTH,
+    threshold_db: float = -30.0,
+    attack: float = 0.05,
+    hold: float = 0.25,
+    release: float = 0.4,
+    block: float = 0.01
+) -> np.ndarray:
+    """Per-sample music gain that dips to depth while the voice is speaking.
+
+    A vectorized envelope follower: the voice's RMS level per block is
+    compared against threshold_db below its loudest block, speech is held
+    through the gaps between words, and the gain moves between 1 and depth
+    along two moving averages: one looking ahead over attack (the music is
+    already down when a word starts) and one lagging over release, taking
+    whichever is lower.
+    """
+    block_length = max(1, int(block * sample_rate))
+    blocks = -(-samples // block_length)
+    power = np.zeros(blocks * block_length, dtype=np.float32)
+    mono = _as_2d(voice).mean(axis=1)[:samples]
+    power[:len(mono)] = mono * mono
+    level = np.sqrt(power.reshape(blocks, block_length).mean(axis=1))
+
+    threshold = max(float(level.max()) * 10 ** (threshold_db / 20), 1e-4)
+    held = max(1, int(round(hold / block)))
+    speaking = np.convolve(level > threshold, np.ones(held), mode='full')[:blocks] > 0
+    target = np.where(speaking, depth, 1.0)
+
+    gain = np.minimum(_moving_average(target, int(round(attack / block)), ahead=True),
+                      _moving_average(target, int(round(release / block)), ahead=False))
+    centers = (np.arange(blocks) + 0.5) * block_length
+    return np.interp(np.arange(samples), centers, gain).astype(np.float32)
+
+
+def mix(
+    voice: Optional[np.ndarray],
+    music: Optional[np.ndarray],
+    duration: float,
+    sample_rate: int = SAMPLE_RATE,
+    music_gain: float = MUSIC_UNDER_VOICE,
+    duck: bool = True,
+    loop_music: bool = True
+) -> Optional[np.ndarray]:
+    """One float32 buffer of exactly duration seconds, shape (samples, channels).
+
+    The voice is trimmed or padded with silence and the music trimmed or
+    looped to the same length. Music plays at full level on its own and at
+    music_gain under a voice, ducked further while it speaks. Mono and stereo
+    inputs mix to the wider of the two; the result is scaled down only if it
+    would clip. Returns None when there is neither voice nor music.
+    """
+    if voice is None and music is None:
+        return None
+    samples = int(round(duration * sample_rate))
+    voice = fit_length(voice, samples) if voice is not None else None
+    music = fit_length(music, samples, loop=loop_music) if music is not None else None
+    channels = max(pcm.shape[1] for pcm in (voice, music) if pcm is not None)
+    out = np.zeros((samples, channels), dtype=np.float32)
+
+    if music is not None:
+        if voice is None:
+            out += music
+        elif duck:
+            out += music * (music_gain * duck_gains(voice, samples, sample_rate))[:, None]
+        else:
+            out += music * music_gain
+    if voice is not None:
+        out += voice
+
+    peak = float(np.abs(out).max()) if samples else 0.0
+    if peak > 1.0:
+        out *= 0.99 / peak
+    return out
@@ -0,0 +1,180 @@
+import os
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+
+# Bump whenever a stem sounds different, so cached music is regenerated
+SYNTH_VERSION = "1"
+SAMPLE_RATE = 44100
+
+
+def _phase(freq: float, n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Phase in radians of a tone at sample indices n, reduced exactly before going to float32"""
+    cycles = np.mod(freq * n, sample_rate) / sample_rate
+    return (2 * np.pi * cycles).astype(np.float32)
+
+
+def _tone(freq: float, n: np.ndarray, sample_rate: int) -> np.ndarray:
+    return np.sin(_phase(freq, n, sample_rate))
+
+
+def _hits(length: int, interval: int, hit: np.ndarray) -> np.ndarray:
+    """Percussion loop: one copy of each row of hit per interval samples, scatter-added.
+
+    hit is a single (samples,) sound or one (hits, samples) row per onset;
+    tails running past the end wrap to the start so the loop is seamless.
+    """
+    onsets = np.arange(0, length, interval)
+    hit = np.broadcast_to(hit, (len(onsets), hit.shape[-1]))
+    index = (onsets[:, None] + np.arange(hit.shape[1])[None, :]) % length
+    return np.bincount(index.ravel(), weights=hit.ravel(), minlength=length).astype(np.float32)
+
+
+def _kick(freq: float, samples: int, decay: float, sample_rate: int) -> np.ndarray:
+    n = np.arange(samples)
+    return _tone(freq, n, sample_rate) * np.exp(-n / decay, dtype=np.float32)
+
+
+def _electronic(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Kick on every beat at 120 BPM, hi-hats on eighths, one A-C-E-G melody note per second"""
+    length = len(n)
+    audio = 0.5 * _hits(length, sample_rate // 2, _kick(60, 1000, 400, sample_rate))
+
+    rng = np.random.default_rng(0)
+    hats = rng.normal(0, 0.1, (-(-length // (sample_rate // 4)), 200)).astype(np.float32)
+    audio += 0.2 * _hits(length, sample_rate // 4, hats * np.exp(-np.arange(200) / 50, dtype=np.float32))
+
+    notes = np.array([440, 523, 659, 784])[(n // sample_rate) % 4]
+    audio += 0.2 * np.sin(_phase(1, notes * n, sample_rate))
+    return audio
+
+
+def _ambient(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """A minor pad with a slow swell"""
+    modulation = 1 + 0.1 * _tone(0.5, n, sample_rate)
+    pad = sum(_tone(freq, n, sample_rate) for freq in (220, 330, 440, 550))
+    return 0.15 * pad * modulation
+
+
+def _chill(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """G major chord with octave harmonics and a gentle tremolo"""
+    audio = np.zeros(len(n), dtype=np.float32)
+    for i, freq in enumerate((196, 294, 370, 440)):
+        audio += (0.2 - i * 0.02) * (_tone(freq, n, sample_rate) + 0.3 * _tone(2 * freq, n, sample_rate))
+    return audio * (1 + 0.05 * _tone(3, n, sample_rate))
+
+
+def _tech(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Bass sweeping 80-160-80 Hz under a square-wave A minor arpeggio, one note per second"""
+    period = len(n) / sample_rate
+    t = n / sample_rate
+    # Instantaneous frequency 120 - 40 cos(2 pi t / period), integrated in closed form
+    cycles = 120 * t - 40 * period / (2 * np.pi) * np.sin(2 * np.pi * t / period)
+    audio = 0.3 * np.sin((2 * np.pi * np.mod(cycles, 1)).astype(np.float32))
+
+    notes = np.array([220, 277, 330, 415])[(n // sample_rate) % 4]
+    audio += 0.2 * np.sign(np.sin(_phase(1, notes * n, sample_rate)))
+    return audio
+
+
+def _finance(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Low A minor chord with a soft hit every second"""
+    audio = np.zeros(len(n), dtype=np.float32)
+    for i, freq in enumerate((110, 165, 220, 275)):
+        audio += (0.25 - i * 0.03) * 0.3 * _tone(freq, n, sample_rate)
+    return audio + 0.3 * _hits(len(n), sample_rate, _kick(100, 500, 200, sample_rate))
+
+
+def _workout(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Kick at 180 BPM under a driving 440 Hz synth"""
+    audio = 0.5 * _hits(len(n), sample_rate // 3, _kick(50, 800, 250, sample_rate))
+    return audio + 0.3 * 0.35 * _tone(440, n, sample_rate)
+
+
+def _simple(n: np.ndarray, sample_rate: int) -> np.ndarray:
+    """Plain C major chord"""
+    return 0.2 * sum(_tone(freq, n, sample_rate) for freq in (262, 330, 392))
+
+
+# Loop length in seconds (every tone and pattern repeats within it) and peak level
+# the loop is normalized to, then the whole-track envelope: fade in and out in
+# seconds and a linear gain ramp from start to end of the track
+STEMS: Dict[str, Dict] = {
+    'electronic': {'synth': _electronic, 'seconds': 4, 'peak': 0.8, 'fade': 0.0, 'ramp': (1.0, 1.0)},
+    'ambient': {'synth': _ambient, 'seconds': 2, 'peak': 0.6, 'fade': 0.5, 'ramp': (1.0, 1.0)},
+    'chill': {'synth': _chill, 'seconds': 4, 'peak': 0.6, 'fade': 1.0, 'ramp': (1.0, 1.0)},
+    'tech': {'synth': _tech, 'seconds': 4, 'peak': 0.5, 'fade': 0.0, 'ramp': (1.0, 1.0)},
+    'finance': {'synth': _finance, 'seconds': 2, 'peak': 0.6, 'fade': 0.0, 'ramp': (0.4, 1.0)},
+    'workout': {'synth': _workout, 'seconds': 2, 'peak': 0.7, 'fade': 0.0, 'ramp': (0.6, 1.0)},
+    'simple': {'synth': _simple, 'seconds': 1, 'peak': 0.6, 'fade': 0.25, 'ramp': (1.0, 1.0)},
+}
+
+# Which stem each reel style plays
+STYLE_STEMS = {
+    'trendy': 'electronic',
+    'business': 'ambient',
+    'lifestyle': 'chill',
+    'tech': 'tech',
+    'finance': 'finance',
+    'fitness': 'workout',
+}
+
+
+def stem_for_style(style: str) -> str:
+    return STYLE_STEMS.get(style, 'chill')
+
+
+@lru_cache(maxsize=32)
+def stem(name: str, sample_rate: int = SAMPLE_RATE, cache_dir: Optional[str] = None) -> np.ndarray:
+    """One seamless loop of a stem as read-only float32 PCM, synthesized once per process.
+
+    With cache_dir the loop is also stored there as raw little-endian
+    float32, keyed by stem, SYNTH_VERSION and sample rate, so later
+    processes read it back instead of synthesizing it.
+    """
+    config = STEMS[name]
+    samples = config['seconds'] * sample_rate
+    path = os.path.join(cache_dir, f"{name}_v{SYNTH_VERSION}_{sample_rate}.f32") if cache_dir else None
+
+    audio = None
+    if path and os.path.exists(path):
+        audio = np.fromfile(path, dtype='<f4').astype(np.float32, copy=False)
+        if len(audio) != samples:
+            audio = None  # Truncated by a crash or foreign file; regenerate
+    if audio is None:
+        audio = np.asarray(config['synth'](np.arange(samples), sample_rate), dtype=np.float32)
+        audio *= config['peak'] / max(float(np.abs(audio).max()), 1e-9)
+        if path:
+            os.makedirs(cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            audio.astype('<f4').tofile(temp_path)
+            os.replace(temp_path, path)
+    audio.flags.writeable = False
+    return audio
+
+
+def music_pcm(
+    name: str, duration: float, sample_rate: int = SAMPLE_RATE, cache_dir: Optional[str] = None
+) -> np.ndarray:
+    """Mono float32 PCM of a stem tiled to duration seconds, with its track envelope"""
+    config = STEMS[name]
+    samples = int(duration * sample_rate)
+    audio = np.resize(stem(name, sample_rate, cache_dir), samples)
+
+    start, end = config['ramp']
+    if start != end:
+        audio *= np.linspace(start, end, samples, dtype=np.float32)
+    fade = min(int(config['fade'] * sample_rate), samples // 2)
+    if fade:
+        ramp = np.linspace(0, 1, fade, dtype=np.float32)
+        audio[:fade] *= ramp
+        audio[samples - fade:] *= ramp[::-1]
+    return audio
+
+
+def style_music_pcm(
+    style: str, duration: float, sample_rate: int = SAMPLE_RATE, cache_dir: Optional[str] = None
+) -> np.ndarray:
+    """music_pcm for the stem a reel style plays"""
+    return music_pcm(stem_for_style(style), duration, sample_rate, cache_dir)
@@ -0,0 +1,257 @@
+import os
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Callable, Iterator, List, Optional, Sequence, Tuple
+
+from encoder import EncoderSettings, FFmpegWriter, concat_files, report_frames
+
+
+def default_render_workers() -> int:
+    """Worker count from RENDER_WORKERS, defaulting to every available core"""
+    return int(os.getenv("RENDER_WORKERS", 0)) or os.cpu_count() or 1
+
+
+def default_render_mode() -> str:
+    """Parallel strategy from RENDER_MODE: 'segments' (default) or 'frames'"""
+    return os.getenv("RENDER_MODE", "segments")
+
+
+def _pool_context():
+    """Start workers without fork so they never inherit open encoder pipes.
+
+    A forked worker keeps copies of ffmpeg's stdin and audio pipe fds alive,
+    so ffmpeg never sees EOF and the export deadlocks.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+class SegmentSequence:
+    """Picklable make_frame that plays segment renderers back to back.
+
+    Timing matches mp.concatenate_videoclips: each segment owns
+    [start, start + duration) and times past the end hold the last segment.
+    """
+
+    def __init__(self, segments: Sequence[Tuple[Callable[[float], np.ndarray], float]]):
+        self.renderers = [renderer for renderer, _ in segments]
+        durations = [duration for _, duration in segments]
+        self.starts = np.concatenate([[0], np.cumsum(durations)[:-1]])
+        self.duration = float(sum(durations))
+
+    def __call__(self, t: float) -> np.ndarray:
+        index = int(np.searchsorted(self.starts, t, side='right')) - 1
+        index = min(max(index, 0), len(self.renderers) - 1)
+        return self.renderers[index](t - self.starts[index])
+
+
+# Per-worker state, set once by the pool initializer so the renderer (and the
+# sprites it caches) is unpickled once per process rather than once per chunk
+_worker_renderer = None
+
+
+def _init_worker(renderer: Callable[[float], np.ndarray]):
+    global _worker_renderer
+    _worker_renderer = renderer
+
+
+def _render_chunk(shm_name: str, shape: Tuple[int, ...], start: int, stop: int, fps: float) -> int:
+    """Render frames [start, stop) into a shared-memory slot, in one batch if the renderer supports it"""
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        frames = np.ndarray(shape, dtype=np.uint8, buffer=shm.buf)
+        if hasattr(_worker_renderer, 'render_batch'):
+            _worker_renderer.render_batch(np.arange(start, stop) / fps, out=frames[:stop - start])
+        else:
+            for i in range(start, stop):
+                frames[i - start] = _worker_renderer(i / fps)
+        del frames
+    finally:
+        shm.close()
+    return stop - start
+
+
+class ParallelRenderer:
+    """Render a make_frame over a process pool and yield frames in order.
+
+    The timeline is split into chunks of consecutive frames. Each worker
+    renders its chunk straight into a shared-memory slot, so frames never go
+    through a pickle pipe, and at most one slot per worker (plus one being
+    drained) is alive at a time to bound memory.
+    """
+
+    def __init__(self, workers: Optional[int] = None, chunk_frames: int = 4):
+        self.workers = workers or default_render_workers()
+        self.chunk_frames = chunk_frames
+
+    def iter_frames(
+        self,
+        renderer: Callable[[float], np.ndarray],
+        duration: float,
+        fps: float,
+        size: Tuple[int, int]
+    ) -> Iterator[np.ndarray]:
+        """Yield every frame of the timeline in order; each frame is only valid until the next one"""
+        width, height = size
+        nframes = int(duration * fps)
+        chunk_shape = (self.chunk_frames, height, width, 3)
+        slot_count = self.workers + 1
+        slots = [shared_memory.SharedMemory(create=True, size=int(np.prod(chunk_shape)))
+                 for _ in range(slot_count)]
+
+        try:
+            with ProcessPoolExecutor(self.workers, mp_context=_pool_context(),
+                                     initializer=_init_worker, initargs=(renderer,)) as pool:
+                starts = list(range(0, nframes, self.chunk_frames))
+                pending = []
+
+                def submit(chunk_index):
+                    start = starts[chunk_index]
+                    stop = min(start + self.chunk_frames, nframes)
+                    slot = slots[chunk_index % slot_count]
+                    pending.append((slot, pool.submit(_render_chunk, slot.name, chunk_shape, start, stop, fps)))
+
+                for chunk_index in range(min(slot_count, len(starts))):
+                    submit(chunk_index)
+                next_chunk = len(pending)
+
+                while pending:
+                    slot, future = pending.pop(0)
+                    count = future.result()
+                    frames = np.ndarray(chunk_shape, dtype=np.uint8, buffer=slot.buf)
+                    for i in range(count):
+                        yield frames[i]
+                    del frames
+                    # The slot has been drained, so it can take the next chunk
+                    if next_chunk < len(starts):
+                        submit(next_chunk)
+                        next_chunk += 1
+        finally:
+            for slot in slots:
+                slot.close()
+                slot.unlink()
+
+
+def write_videofile_parallel(
+    renderer: Callable[[float], np.ndarray],
+    duration: float,
+    output_path: str,
+    fps: float,
+    size: Tuple[int, int] = (1080, 1920),
+    audio: Optional[np.ndarray] = None,
+    settings: Optional[EncoderSettings] = None,
+    workers: Optional[int] = None,
+    progress: Optional[Callable[[float], None]] = None
+) -> str:
+    """Encode a picklable make_frame with parallel workers feeding one ffmpeg writer.
+
+    progress, if given, is called with the fraction of frames written after
+    each rendered chunk.
+    """
+    parallel = ParallelRenderer(workers)
+    frames = parallel.iter_frames(renderer, duration, fps, size)
+    with FFmpegWriter(output_path, size, fps, settings, audio) as writer:
+        for frame in report_frames(frames, int(duration * fps), progress, parallel.chunk_frames):
+            writer.write_frame(frame)
+
+    return output_path
+
+
+def _encode_segment(
+    renderer: Callable[[float], np.ndarray],
+    first_frame: int,
+    last_frame: int,
+    start: float,
+    fps: float,
+    size: Tuple[int, int],
+    path: str,
+    settings: EncoderSettings
+) -> str:
+    """Render and encode one segment's frames [first_frame, last_frame) to its own file"""
+    with FFmpegWriter(path, size, fps, settings) as writer:
+        for i in range(first_frame, last_frame):
+            writer.write_frame(renderer(i / fps - start))
+    return path
+
+
+def encode_segments(
+    segments: Sequence[Tuple[Callable[[float], np.ndarray], float]],
+    stem: str,
+    fps: float,
+    size: Tuple[int, int] = (1080, 1920),
+    settings: Optional[EncoderSettings] = None,
+    workers: Optional[int] = None,
+    temp_dir: str = "../temp",
+    progress: Optional[Callable[[float], None]] = None
+) -> List[str]:
+    """Encode each segment to a video-only file in its own process and return the paths in order.
+
+    Every intermediate is written with the same encoder settings, so
+    concat_files can stream-copy them into one output. Frame ranges are
+    assigned on the global timeline so per-segment rounding never drifts
+    the video against the audio muxed in later. The caller removes the
+    files; on failure they are removed here. progress, if given, is called
+    with the fraction of frames encoded as each segment finishes.
+    """
+    os.makedirs(temp_dir, exist_ok=True)
+    settings = settings or EncoderSettings()
+    workers = min(workers or default_render_workers(), len(segments))
+
+    jobs = []
+    start = 0.0
+    for index, (renderer, duration) in enumerate(segments):
+        first_frame = int(round(start * fps))
+        last_frame = int(round((start + duration) * fps))
+        path = os.path.join(temp_dir, f"{stem}_segment_{index}.mp4")
+        jobs.append((renderer, first_frame, last_frame, start, fps, size, path, settings))
+        start += duration
+
+    try:
+        with ProcessPoolExecutor(workers, mp_context=_pool_context()) as pool:
+            futures = {pool.submit(_encode_segment, *job): job[2] - job[1] for job in jobs}
+            total = sum(futures.values())
+            encoded = 0
+            for future in as_completed(futures):
+                future.result()
+                encoded += futures[future]
+                if progress is not None:
+                    progress(encoded / max(total, 1))
+            return [future.result() for future in futures]
+    except BaseException:
+        remove_files(job[6] for job in jobs)
+        raise
+
+
+def remove_files(paths):
+    """Delete whichever of paths exist"""
+    for path in paths:
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def write_segments_parallel(
+    segments: Sequence[Tuple[Callable[[float], np.ndarray], float]],
+    output_path: str,
+    fps: float,
+    size: Tuple[int, int] = (1080, 1920),
+    audio: Optional[np.ndarray] = None,
+    settings: Optional[EncoderSettings] = None,
+    workers: Optional[int] = None,
+    temp_dir: str = "../temp"
+) -> str:
+    """Encode each segment in its own process, then join them without re-encoding.
+
+    See encode_segments; the audio track is muxed in while the segments are
+    stream-copied into the output.
+    """
+    settings = settings or EncoderSettings()
+    stem = os.path.splitext(os.path.basename(output_path))[0]
+    segment_paths = encode_segments(segments, stem, fps, size, settings, workers, temp_dir)
+    try:
+        concat_files(segment_paths, output_path, settings, audio)
+    finally:
+        remove_files(segment_paths)
+
+    return output_path
@@ -0,0 +1,180 @@
+import math
+import numpy as np
+from functools import lru_cache
+from PIL import Image, ImageColor, ImageDraw
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from layers import Sprite, composite
+
+try:
+    import cv2
+except ImportError:
+    cv2 = None
+
+# Element centers are snapped to 1/SUBPIXEL_STEPS of a pixel; shapes are
+# drawn SUPERSAMPLE times larger and box-filtered down for anti-aliasing
+SUBPIXEL_STEPS = 4
+SUPERSAMPLE = 4
+
+
+def _draw_shape(draw: ImageDraw.ImageDraw, shape: str, x: float, y: float, r: float, fill):
+    """Draw one shape centered at (x, y) with size r, in the generators' original proportions"""
+    if shape == 'circle':
+        draw.ellipse([x - r, y - r, x + r, y + r], fill=fill)
+    elif shape == 'square':
+        draw.rectangle([x - r, y - r, x + r, y + r], fill=fill)
+    elif shape == 'triangle':
+        draw.polygon([(x, y - r), (x - r, y + r), (x + r, y + r)], fill=fill)
+    elif shape == 'diamond':
+        draw.polygon([(x, y - r), (x + r / 2, y), (x, y + r), (x - r / 2, y)], fill=fill)
+    elif shape == 'star':
+        points = []
+        for p in range(10):
+            radius = r if p % 2 == 0 else r / 2
+            points.append((x + radius * math.cos(math.radians(p * 36)),
+                           y + radius * math.sin(math.radians(p * 36))))
+        draw.polygon(points, fill=fill)
+    elif shape == 'heart':
+        draw.ellipse([x - r / 2, y - r / 2, x + r / 2, y], fill=fill)
+        draw.ellipse([x, y - r / 2, x + r, y], fill=fill)
+        draw.polygon([(x + r / 4, y), (x - r / 2, y + r), (x + r, y + r)], fill=fill)
+    elif shape == 'thumb':
+        draw.rectangle([x - r / 3, y, x + r / 3, y + r], fill=fill)
+        draw.ellipse([x - r / 2, y - r / 2, x + r / 2, y + r / 2], fill=fill)
+    elif shape == 'bolt':
+        draw.polygon([(x, y - r), (x + r / 2, y), (x - r / 4, y), (x, y + r)], fill=fill)
+    else:
+        raise ValueError(f"Unknown particle shape '{shape}'")
+
+
+@lru_cache(maxsize=4096)
+def shape_sprite(shape: str, radius: int, fill, dx: int = 0, dy: int = 0) -> Optional[Sprite]:
+    """Anti-aliased atlas entry: shape of size radius, centered (dx, dy) / SUBPIXEL_STEPS right of and below its anchor"""
+    if radius <= 0:
+        return None
+    pad = radius + 2
+    size = 2 * pad * SUPERSAMPLE
+    canvas = Image.new('RGBA', (size, size), (0, 0, 0, 0))
+    center_x = (pad + dx / SUBPIXEL_STEPS) * SUPERSAMPLE
+    center_y = (pad + dy / SUBPIXEL_STEPS) * SUPERSAMPLE
+    _draw_shape(ImageDraw.Draw(canvas), shape, center_x, center_y, radius * SUPERSAMPLE, fill)
+
+    # Box-filter in premultiplied space (Pillow's RGBa) so edge colors do not darken
+    image = canvas.convert('RGBa').reduce(SUPERSAMPLE).convert('RGBA')
+
+    bbox = image.getbbox()
+    if bbox is None:
+        return None
+    return Sprite(np.array(image.crop(bbox)), bbox[0] - pad, bbox[1] - pad)
+
+
+def _snap(positions: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Split float pixel positions into integer anchors and subpixel steps"""
+    steps = np.round(positions * SUBPIXEL_STEPS).astype(np.int64)
+    return steps // SUBPIXEL_STEPS, steps % SUBPIXEL_STEPS
+
+
+class ParticleLayer:
+    """Elements that share one motion function, with a fixed shape and fill each.
+
+    motion(t, i) gets frame times as a (T, 1) column and element indices as
+    a (1, n) row and returns x, y and radius in output pixels plus a
+    visibility mask (or None), each broadcastable to (T, n).
+    """
+
+    def __init__(self, motion: Callable, shapes: Sequence[str], fills: Sequence):
+        self.motion = motion
+        self.shapes = list(shapes)
+        self.fills = [ImageColor.getrgb(fill) if isinstance(fill, str) else tuple(fill) for fill in fills]
+        self.index = np.arange(len(self.shapes))[None, :]
+
+    def evaluate(self, ts: np.ndarray) -> Tuple[np.ndarray, ...]:
+        x, y, radius, visible = self.motion(ts[:, None], self.index)
+        shape = (len(ts), len(self.shapes))
+        if visible is None:
+            visible = np.ones(shape, dtype=bool)
+        x_px, x_sub = _snap(np.broadcast_to(x, shape))
+        y_px, y_sub = _snap(np.broadcast_to(y, shape))
+        radius = np.broadcast_to(radius, shape).astype(np.int64)
+        visible = np.broadcast_to(visible, shape) & (radius > 0)
+        return x_px, y_px, x_sub, y_sub, radius, visible
+
+    def draw(self, frame: np.ndarray, values: Tuple[np.ndarray, ...]):
+        x_px, y_px, x_sub, y_sub, radius, visible = values
+        for i in np.flatnonzero(visible):
+            sprite = shape_sprite(self.shapes[i], int(radius[i]), self.fills[i], int(x_sub[i]), int(y_sub[i]))
+            composite(frame, sprite, int(x_px[i]), int(y_px[i]))
+
+
+class LineLayer:
+    """Anti-aliased line segments of one color.
+
+    motion(t, i) returns x1, y1, x2, y2 and width in output pixels, each
+    broadcastable to (T, n).
+    """
+
+    def __init__(self, motion: Callable, count: int, fill):
+        self.motion = motion
+        self.fill = ImageColor.getrgb(fill) if isinstance(fill, str) else tuple(fill)
+        self.index = np.arange(count)[None, :]
+
+    def evaluate(self, ts: np.ndarray) -> Tuple[np.ndarray, ...]:
+        shape = (len(ts), self.index.shape[1])
+        x1, y1, x2, y2, width = (np.broadcast_to(value, shape) for value in self.motion(ts[:, None], self.index))
+        # cv2 takes subpixel endpoints as fixed point with SUBPIXEL_STEPS fractional steps
+        points = np.round(np.stack([x1, y1, x2, y2], axis=-1) * SUBPIXEL_STEPS).astype(np.int32)
+        return points, width.astype(np.int64)
+
+    def draw(self, frame: np.ndarray, values: Tuple[np.ndarray, ...]):
+        points, widths = values
+        if cv2 is None:
+            image = Image.fromarray(frame)
+            draw = ImageDraw.Draw(image)
+            for (x1, y1, x2, y2), width in zip(points / SUBPIXEL_STEPS, widths):
+                draw.line([(x1, y1), (x2, y2)], fill=self.fill, width=int(width))
+            frame[...] = np.asarray(image)
+            return
+        # One polylines call per distinct width instead of one call per line
+        shift = SUBPIXEL_STEPS.bit_length() - 1
+        for width in np.unique(widths):
+            lines = [segment.reshape(2, 2) for segment in points[widths == width]]
+            cv2.polylines(frame, lines, False, self.fill, int(width), cv2.LINE_AA, shift)
+
+
+class ParticleSystem:
+    """Decorations whose motion is evaluated for the whole clip up front.
+
+    With fps and duration, every layer is evaluated for all frame times in
+    one vectorized pass the first time a frame is drawn; the timeline is
+    aligned to that first frame time, since segments of a reel start at
+    arbitrary offsets. Times off that grid are evaluated on the fly.
+    """
+
+    def __init__(self, layers: List, fps: Optional[float] = None, duration: Optional[float] = None):
+        self.layers = layers
+        self.fps = fps
+        self.duration = duration
+        self._ts: Optional[np.ndarray] = None
+        self._values: Optional[List[Tuple[np.ndarray, ...]]] = None
+
+    def _build_timeline(self, t: float):
+        step = 1.0 / self.fps
+        phase = t % step
+        self._ts = phase + np.arange(int(math.ceil((self.duration - phase) * self.fps)) + 1) * step
+        self._values = [layer.evaluate(self._ts) for layer in self.layers]
+
+    def _frame_values(self, t: float) -> List[Tuple[np.ndarray, ...]]:
+        if self.fps and self.duration:
+            if self._ts is None:
+                self._build_timeline(t)
+            k = int(round((t - self._ts[0]) * self.fps))
+            if 0 <= k < len(self._ts) and abs(self._ts[k] - t) < 1e-6:
+                return [tuple(array[k] for array in values) for values in self._values]
+        ts = np.array([float(t)])
+        return [tuple(array[0] for array in layer.evaluate(ts)) for layer in self.layers]
+
+    def draw(self, frame: np.ndarray, t: float, layers: Optional[Sequence[int]] = None):
+        """Draw the layers (all, or the given indices in order) for time t into frame"""
+        values = self._frame_values(t)
+        for index in (range(len(self.layers)) if layers is None else layers):
+            self.layers[index].draw(frame, values[index])
@@ -0,0 +1,134 @@
+import asyncio
+import functools
+import inspect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class Stage:
+    """One node of a StageGraph.
+
+    fn gets the results of the stages listed in after as keyword arguments
+    named after them. Coroutine functions (network-bound work) run on the
+    event loop; with executor=True a plain function runs in the loop's
+    default thread pool instead, so CPU-bound or blocking work does not
+    stall the stages awaiting I/O next to it.
+    """
+
+    def __init__(self, name: str, fn: Callable, after: Sequence[str] = (), executor: bool = False):
+        self.name = name
+        self.fn = fn
+        self.after = tuple(after)
+        self.executor = executor
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+        self.result: Any = None
+
+
+class StageGraph:
+    """Runs stages as soon as their dependencies finish and records a timing span for each.
+
+    on_start, if given, is called on the event loop thread with the stage
+    name just before the stage starts. cancelled is set once a stage fails;
+    long thread-pool stages can poll it to stop early.
+    """
+
+    def __init__(self, on_start: Optional[Callable[[str], None]] = None):
+        self.stages: Dict[str, Stage] = {}
+        self.on_start = on_start
+        self.origin: Optional[float] = None
+        self.cancelled = threading.Event()
+        self._threads: List[asyncio.Future] = []
+
+    def add(self, name: str, fn: Callable, after: Sequence[str] = (), executor: bool = False) -> 'StageGraph':
+        missing = [dependency for dependency in after if dependency not in self.stages]
+        if missing:
+            # Requiring dependencies first also rules out cycles
+            raise ValueError(f"Stage '{name}' depends on unknown stages {missing}")
+        self.stages[name] = Stage(name, fn, after, executor)
+        return self
+
+    async def _run_stage(self, stage: Stage, tasks: Dict[str, asyncio.Task]) -> Any:
+        inputs = {dependency: await tasks[dependency] for dependency in stage.after}
+        if self.on_start:
+            self.on_start(stage.name)
+        stage.start = time.perf_counter()
+        try:
+            if stage.executor:
+                loop = asyncio.get_running_loop()
+                future = loop.run_in_executor(None, functools.partial(stage.fn, **inputs))
+                self._threads.append(future)
+                # Recorded even if this task is cancelled first, so callers can clean up what it made
+                future.add_done_callback(lambda f: setattr(stage, 'result', f.result()) if not f.exception() else None)
+                # Shielded so run() can still wait for the thread after cancelling this task
+                stage.result = await asyncio.shield(future)
+            else:
+                result = stage.fn(**inputs)
+                stage.result = await result if inspect.isawaitable(result) else result
+            return stage.result
+        finally:
+            stage.end = time.perf_counter()
+
+    async def run(self) -> Dict[str, Any]:
+        """Run every stage and return their results by name.
+
+        The first failure sets cancelled, cancels stages that have not
+        finished and is re-raised once work already handed to the thread
+        pool has returned, so the caller can clean up after it. Results of
+        stages that did finish stay on stage.result.
+        """
+        self.origin = time.perf_counter()
+        self.cancelled.clear()
+        self._threads = []
+        for stage in self.stages.values():
+            stage.start = stage.end = stage.result = None
+        tasks: Dict[str, asyncio.Task] = {}
+        for name, stage in self.stages.items():
+            tasks[name] = asyncio.ensure_future(self._run_stage(stage, tasks))
+        try:
+            await asyncio.gather(*tasks.values())
+        except BaseException:
+            self.cancelled.set()
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), *self._threads, return_exceptions=True)
+            raise
+        return {name: task.result() for name, task in tasks.items()}
+
+    def critical_path(self) -> List[str]:
+        """Stages on the chain that determined the total time, first to last.
+
+        Walks back from the stage that finished last through whichever
+        dependency finished last.
+        """
+        finished = [stage for stage in self.stages.values() if stage.end is not None]
+        if not finished:
+            return []
+        stage = max(finished, key=lambda s: s.end)
+        path = [stage.name]
+        while stage.after:
+            stage = max((self.stages[name] for name in stage.after), key=lambda s: s.end or 0)
+            path.append(stage.name)
+        return path[::-1]
+
+    def spans(self) -> List[Dict]:
+        """(name, start, end, seconds) of every stage that ran, relative to the start of run()"""
+        return [
+            {
+                "name": stage.name,
+                "start": stage.start - self.origin,
+                "end": stage.end - self.origin,
+                "seconds": stage.end - stage.start,
+            }
+            for stage in sorted(self.stages.values(), key=lambda s: s.start or 0)
+            if stage.start is not None and stage.end is not None
+        ]
+
+    def print_spans(self):
+        critical = set(self.critical_path())
+        print("Stage timings (* on the critical path):")
+        for span in self.spans():
+            marker = '*' if span["name"] in critical else ' '
+            print(f"  {marker} {span['name']:<10} {span['start']:7.2f}s -> {span['end']:7.2f}s  "
+                  f"({span['seconds']:.2f}s)")
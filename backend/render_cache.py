@@ -0,0 +1,279 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Bump whenever the generator renders different output for the same request,
+# so stale reels are never served from the cache
+GENERATOR_VERSION = "4"
+
+
+def file_digest(path: str, chunk_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in fixed-size chunks"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def render_key(
+    prompt: str,
+    style: str,
+    duration: int,
+    quality: str,
+    asset_digests: Iterable[str] = (),
+    version: str = GENERATOR_VERSION
+) -> str:
+    """Canonical hash of everything that determines a rendered reel"""
+    payload = {
+        "prompt": " ".join(prompt.split()),
+        "style": style,
+        "duration": int(duration),
+        "quality": quality,
+        "assets": list(asset_digests),
+        "version": version,
+    }
+    canonical = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+def request_key(request: Dict, asset_digests: Optional[List[str]] = None) -> str:
+    """render_key for a dict of generate_reel keyword arguments.
+    
+    Pass asset_digests (images in order, then audio) when they are already
+    known to skip re-reading the uploaded files.
+    """
+    if asset_digests is None:
+        paths = list(request.get("image_paths") or [])
+        if request.get("audio_path"):
+            paths.append(request["audio_path"])
+        asset_digests = [file_digest(path) for path in paths]
+    return render_key(
+        request["prompt"],
+        request.get("style", "trendy"),
+        request.get("duration", 15),
+        request.get("quality", "standard"),
+        asset_digests
+    )
+
+
+def default_index_path() -> str:
+    """Render cache index from RENDER_CACHE_INDEX.
+
+    It sits next to the outputs directory rather than in it, where it would
+    be publicly served, or in temp, which /cleanup empties (orphaning every
+    cached reel).
+    """
+    return os.getenv("RENDER_CACHE_INDEX", "../render_cache/index.json")
+
+
+def _process_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class RenderCache:
+    """Content-addressed index of finished reels in the outputs directory.
+
+    Entries map a render_key to an output file and are evicted least
+    recently used first once the cache holds more than max_entries reels
+    or max_bytes of video. The index is a small JSON file outside the
+    served directory, shared by every API process on the host: each change
+    reloads it, merges, evicts and rewrites it atomically under a file lock.
+
+    Hits only update recency in memory; it reaches the index with the next
+    put or flush. Reels a process still hands out (see hold) are recorded
+    in the index with its pid and never evicted while that process lives,
+    so the cache can run over budget until they are released.
+    """
+
+    def __init__(
+        self,
+        directory: str = "../outputs",
+        max_bytes: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        index_path: Optional[str] = None
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes or int(os.getenv("RENDER_CACHE_MAX_MB", 2048)) * 1024 * 1024
+        self.max_entries = max_entries or int(os.getenv("RENDER_CACHE_MAX_ENTRIES", 200))
+        self.index_path = index_path or default_index_path()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.entries: Dict[str, Dict] = {}
+        # Hits not yet written to the index: key -> [last access, hit count]
+        self._touched: Dict[str, List] = {}
+        # Reels this process still hands out, with how many jobs refer to each
+        self._held: Dict[str, int] = {}
+        self._index_stamp = None
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        os.makedirs(os.path.dirname(os.path.abspath(self.index_path)), exist_ok=True)
+        self._refresh()
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached reel for key (refreshing its recency), or None"""
+        with self._lock:
+            self._refresh()
+            entry = self.entries.get(key)
+            if entry is not None and not os.path.exists(entry["path"]):
+                # Deleted behind our back (e.g. manual cleanup)
+                del self.entries[key]
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            touched = self._touched.setdefault(key, [0.0, 0])
+            touched[0] = time.time()
+            touched[1] += 1
+            return entry["path"]
+
+    def put(self, key: str, path: str):
+        """Record a finished reel and evict old ones if over budget"""
+        now = time.time()
+        entry = {"path": path, "size": os.path.getsize(path), "created": now, "last_access": now, "hits": 0}
+        self._sync(new={key: entry})
+
+    def flush(self):
+        """Write pending hits and held reels to the index"""
+        self._sync()
+
+    def hold(self, path: str) -> bool:
+        """Protect a reel from eviction while a job advertises it; True if it was not held yet.
+
+        Holds reach other processes with the next put or flush.
+        """
+        with self._lock:
+            self._held[path] = self._held.get(path, 0) + 1
+            return self._held[path] == 1
+
+    def release(self, path: str):
+        """Drop one hold taken with hold()"""
+        with self._lock:
+            count = self._held.get(path, 0) - 1
+            if count > 0:
+                self._held[path] = count
+            else:
+                self._held.pop(path, None)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.entries),
+                "bytes": sum(entry["size"] for entry in self.entries.values()),
+                "max_entries": self.max_entries,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "held": len(self._held),
+            }
+
+    @contextmanager
+    def _index_lock(self):
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.index_path}.lock", "a") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _sync(self, new: Optional[Dict[str, Dict]] = None):
+        """Merge local changes into the index on disk, evict, and write it back"""
+        with self._lock, self._index_lock():
+            entries, held = self._read()
+            for key, (last_access, hits) in self._touched.items():
+                if key in entries:
+                    entries[key]["last_access"] = max(entries[key]["last_access"], last_access)
+                    entries[key]["hits"] = entries[key].get("hits", 0) + hits
+            self._touched.clear()
+            entries.update(new or {})
+
+            held = {pid: paths for pid, paths in held.items() if pid != str(os.getpid()) and _process_alive(int(pid))}
+            if self._held:
+                held[str(os.getpid())] = sorted(self._held)
+            protected = set(new or ())
+            held_paths = {path for paths in held.values() for path in paths}
+            protected.update(key for key, entry in entries.items() if entry["path"] in held_paths)
+            self.evictions += self._evict(entries, protected)
+
+            self.entries = entries
+            self._write({"entries": entries, "held": held})
+
+    def _evict(self, entries: Dict[str, Dict], protected: Set[str]) -> int:
+        total = sum(entry["size"] for entry in entries.values())
+        evicted = 0
+        for key in sorted(entries, key=lambda k: entries[k]["last_access"]):
+            if len(entries) <= self.max_entries and total <= self.max_bytes:
+                break
+            if key in protected:
+                continue
+            entry = entries.pop(key)
+            total -= entry["size"]
+            evicted += 1
+            try:
+                os.remove(entry["path"])
+            except OSError:
+                pass
+        return evicted
+
+    def _refresh(self):
+        """Reload the index if another process (or an earlier sync) replaced it"""
+        try:
+            info = os.stat(self.index_path)
+        except OSError:
+            return
+        stamp = (info.st_mtime_ns, info.st_ino)
+        if stamp != self._index_stamp:
+            self.entries, _ = self._read()
+            self._index_stamp = stamp
+
+    def _read(self) -> Tuple[Dict[str, Dict], Dict[str, List[str]]]:
+        try:
+            with open(self.index_path) as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}, {}
+        entries = index.get("entries", {})
+        entries = {key: entry for key, entry in entries.items() if os.path.exists(entry.get("path", ""))}
+        return entries, index.get("held", {})
+
+    def _write(self, index: Dict):
+        # A private temp name per writer, in the same directory so the rename is atomic
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(self.index_path)), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(index, f)
+            os.replace(temp_path, self.index_path)
+        except BaseException:
+            try:
+                os.remove(temp_path)
+            except OSError:
+                pass
+            raise
+        info = os.stat(self.index_path)
+        self._index_stamp = (info.st_mtime_ns, info.st_ino)
@@ -0,0 +1,69 @@
+from typing import Dict, Optional, Tuple
+
+from encoder import EncoderSettings
+
+# Layouts are authored against this canvas and scaled to the output size
+REFERENCE_WIDTH, REFERENCE_HEIGHT = 1080, 1920
+REFERENCE_SIZE = (REFERENCE_WIDTH, REFERENCE_HEIGHT)
+
+
+class RenderProfile:
+    """Output resolution, frame rate and encoder overrides for one quality level.
+
+    preset/crf left as None keep whatever EncoderSettings.from_env() chose.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        width: int,
+        height: int,
+        fps: int,
+        preset: Optional[str] = None,
+        crf: Optional[int] = None,
+        description: str = ""
+    ):
+        self.name = name
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.preset = preset
+        self.crf = crf
+        self.description = description
+
+    @property
+    def size(self) -> Tuple[int, int]:
+        return (self.width, self.height)
+
+    @property
+    def scale(self) -> float:
+        """Factor from reference layout units to output pixels"""
+        return self.width / REFERENCE_WIDTH
+
+    def encoder_settings(self, base: EncoderSettings) -> EncoderSettings:
+        overrides = {}
+        if self.preset is not None:
+            overrides['preset'] = self.preset
+        if self.crf is not None:
+            overrides['crf'] = self.crf
+        return base.replace(**overrides)
+
+
+PROFILES: Dict[str, RenderProfile] = {
+    'draft': RenderProfile('draft', 540, 960, 12, preset='ultrafast', crf=28,
+                           description="Quick preview at half resolution"),
+    'standard': RenderProfile('standard', 1080, 1920, 24,
+                              description="Full resolution with the configured encoder settings"),
+    'final': RenderProfile('final', 1080, 1920, 30, preset='slow', crf=18,
+                           description="Full resolution, smoother motion and higher bitrate"),
+}
+
+DEFAULT_QUALITY = 'standard'
+
+
+def get_profile(quality: Optional[str] = None) -> RenderProfile:
+    """Look up a quality profile by name, raising ValueError for unknown names"""
+    name = (quality or DEFAULT_QUALITY).lower()
+    if name not in PROFILES:
+        raise ValueError(f"Unknown quality '{quality}', expected one of: {', '.join(PROFILES)}")
+    return PROFILES[name]
@@ -0,0 +1,150 @@
+import asyncio
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from encoder import decode_audio
+from music import SAMPLE_RATE
+
+# Silence between consecutive segments, standing in for the pause at a sentence break
+SEGMENT_GAP_SECONDS = 0.15
+
+
+def default_tts_backend() -> str:
+    """Speech engine from TTS_BACKEND: 'gtts' (default) or the offline 'stub'"""
+    return os.getenv("TTS_BACKEND", "gtts")
+
+
+def default_tts_cache_dir() -> str:
+    return os.getenv("TTS_CACHE_DIR", "../temp/tts_cache")
+
+
+def default_tts_workers() -> int:
+    """Segments synthesized at once from TTS_WORKERS, defaulting to 4"""
+    return int(os.getenv("TTS_WORKERS", 4)) or 1
+
+
+def normalize_text(text: str) -> str:
+    """Text as sent to the engine: no symbols TTS would read out, single spaces"""
+    return " ".join(re.sub(r'[^\w\s.,!?]', '', text).split())
+
+
+class GTTSBackend:
+    """Google Translate's TTS over the network; voice is the gTTS accent domain (tld)"""
+
+    def __init__(self, voice: str = "com"):
+        self.voice = voice
+        self.name = f"gtts-{voice}"
+
+    def synthesize(self, text: str, language: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        from gtts import gTTS
+
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=language, tld=self.voice, slow=False).write_to_fp(buffer)
+        return decode_audio(buffer.getvalue(), sample_rate)[:, 0]
+
+
+class StubBackend:
+    """Offline stand-in for tests and development: a soft tone per word at a speaking pace"""
+
+    name = "stub"
+
+    def __init__(self, words_per_minute: int = 150):
+        self.words_per_minute = words_per_minute
+
+    def synthesize(self, text: str, language: str, sample_rate: int = SAMPLE_RATE) -> np.ndarray:
+        word = int(sample_rate * 60 / self.words_per_minute)
+        voiced = int(word * 0.7)
+        n = np.arange(voiced)
+        tone = 0.3 * np.sin(2 * np.pi * 180 * n / sample_rate) * np.sin(np.pi * n / voiced)
+        syllable = np.zeros(word, dtype=np.float32)
+        syllable[:voiced] = tone
+        return np.tile(syllable, max(1, len(text.split())))
+
+
+BACKENDS = {'gtts': GTTSBackend, 'stub': StubBackend}
+
+
+def get_tts_backend(name: Optional[str] = None):
+    name = name or default_tts_backend()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown TTS backend '{name}', expected one of: {', '.join(BACKENDS)}")
+    return BACKENDS[name]()
+
+
+class VoiceoverSynthesizer:
+    """Speaks script segments in parallel, with a disk cache of per-segment PCM.
+
+    Each segment is cached as raw little-endian float32 under a hash of its
+    normalized text, language, the backend's voice and the sample rate, so
+    facts that recur across reels are synthesized once. Segments are joined
+    at the PCM level with a short gap.
+    """
+
+    def __init__(
+        self,
+        backend=None,
+        cache_dir: Optional[str] = None,
+        max_workers: Optional[int] = None,
+        sample_rate: int = SAMPLE_RATE
+    ):
+        self.backend = backend or get_tts_backend()
+        self.cache_dir = cache_dir or default_tts_cache_dir()
+        self.max_workers = max_workers or default_tts_workers()
+        self.sample_rate = sample_rate
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def cache_path(self, text: str, language: str) -> str:
+        payload = [normalize_text(text), language, self.backend.name, self.sample_rate]
+        key = hashlib.sha256(json.dumps(payload).encode("utf-8")).hexdigest()
+        return os.path.join(self.cache_dir, f"{key}.f32")
+
+    def segment_pcm(self, text: str, language: str = "en") -> np.ndarray:
+        """Mono float32 PCM for one segment, from the cache or the backend"""
+        path = self.cache_path(text, language)
+        if os.path.exists(path):
+            with self._lock:
+                self.hits += 1
+            return np.fromfile(path, dtype='<f4').astype(np.float32, copy=False)
+
+        with self._lock:
+            self.misses += 1
+        pcm = np.asarray(self.backend.synthesize(normalize_text(text), language, self.sample_rate), dtype=np.float32)
+        temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        pcm.astype('<f4').tofile(temp_path)
+        os.replace(temp_path, path)
+        return pcm
+
+    async def synthesize(self, texts: Sequence[str], language: str = "en") -> Optional[np.ndarray]:
+        """PCM of the segments spoken in order, or None when there is nothing to say"""
+        texts = [text for text in texts if normalize_text(text)]
+        if not texts:
+            return None
+        loop = asyncio.get_running_loop()
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(texts))) as pool:
+            parts: List[np.ndarray] = await asyncio.gather(
+                *(loop.run_in_executor(pool, self.segment_pcm, text, language) for text in texts)
+            )
+        gap = np.zeros(int(SEGMENT_GAP_SECONDS * self.sample_rate), dtype=np.float32)
+        joined = [gap] * (2 * len(parts) - 1)
+        joined[::2] = parts
+        return np.concatenate(joined)
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,140 @@
+import hashlib
+import os
+import re
+import uuid
+from typing import List, Optional
+
+import aiofiles
+from fastapi import UploadFile
+
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def default_max_file_bytes() -> int:
+    """Per-file upload limit from MAX_UPLOAD_MB, defaulting to 50 MB"""
+    return int(os.getenv("MAX_UPLOAD_MB", 50)) * 1024 * 1024
+
+
+def default_max_request_bytes() -> int:
+    """Per-request upload limit from MAX_REQUEST_UPLOAD_MB, defaulting to 200 MB"""
+    return int(os.getenv("MAX_REQUEST_UPLOAD_MB", 200)) * 1024 * 1024
+
+
+class UploadTooLarge(Exception):
+    """An upload went over the per-file or per-request byte limit"""
+
+
+class StoredUpload:
+    """An uploaded file saved under its content hash"""
+
+    def __init__(self, path: str, digest: str, size: int, filename: str, created: bool = True):
+        self.path = path
+        self.digest = digest
+        self.size = size
+        self.filename = filename
+        # False when an identical file was already in the store
+        self.created = created
+
+
+class UploadStore:
+    """Stream uploads to disk in fixed-size chunks, content addressed.
+
+    Each file is hashed while it is copied, then stored as <sha256><ext>, so
+    identical uploads share one file and two users uploading "image.png"
+    can never overwrite each other. Memory use per upload is one chunk no
+    matter how big the file is.
+    """
+
+    def __init__(
+        self,
+        directory: str = "../uploads",
+        max_file_bytes: Optional[int] = None,
+        max_request_bytes: Optional[int] = None,
+        chunk_size: int = UPLOAD_CHUNK_SIZE
+    ):
+        self.directory = directory
+        self.max_file_bytes = max_file_bytes or default_max_file_bytes()
+        self.max_request_bytes = max_request_bytes or default_max_request_bytes()
+        self.chunk_size = chunk_size
+        os.makedirs(directory, exist_ok=True)
+
+    async def save(self, upload: UploadFile, limit: Optional[int] = None) -> StoredUpload:
+        """Copy one upload to the store, raising UploadTooLarge past limit bytes"""
+        partial_path, digest, size = await self._receive(upload, limit)
+        return self._commit(partial_path, digest, size, upload.filename)
+
+    async def save_all(self, uploads: List[UploadFile]) -> List[StoredUpload]:
+        """Save several uploads that share the per-request byte budget.
+
+        Every upload is received under a private temporary name first and
+        only linked into the store once the whole request is within budget,
+        so a failed request never adds or removes a file in the store that
+        another request might be using.
+        """
+        received = []
+        remaining = self.max_request_bytes
+        try:
+            for upload in uploads:
+                try:
+                    partial_path, digest, size = await self._receive(upload, remaining)
+                except UploadTooLarge:
+                    if remaining < self.max_file_bytes:
+                        raise UploadTooLarge(
+                            f"Uploads are larger than {self.max_request_bytes // (1024 * 1024)} MB in total"
+                        )
+                    raise
+                remaining -= size
+                received.append((partial_path, digest, size, upload.filename))
+            return [self._commit(*item) for item in received]
+        finally:
+            for partial_path, *_ in received:
+                _remove(partial_path)
+
+    async def _receive(self, upload: UploadFile, limit: Optional[int]):
+        """Stream an upload to a private temporary file: (path, sha256 hex digest, size)"""
+        limit = min(limit, self.max_file_bytes) if limit is not None else self.max_file_bytes
+        digest = hashlib.sha256()
+        size = 0
+        partial_path = os.path.join(self.directory, f".incoming_{uuid.uuid4().hex}")
+
+        try:
+            async with aiofiles.open(partial_path, "wb") as f:
+                while True:
+                    chunk = await upload.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > limit:
+                        raise UploadTooLarge(f"{upload.filename} is larger than {limit // (1024 * 1024)} MB")
+                    digest.update(chunk)
+                    await f.write(chunk)
+        except BaseException:
+            _remove(partial_path)
+            raise
+        return partial_path, digest.hexdigest(), size
+
+    def _commit(self, partial_path: str, digest: str, size: int, filename: Optional[str]) -> StoredUpload:
+        """Link a received file into the store under its content hash and drop the temporary name"""
+        path = os.path.join(self.directory, digest + _extension(filename))
+        try:
+            # Linking fails instead of replacing when a request stored the same content first
+            os.link(partial_path, path)
+            created = True
+        except FileExistsError:
+            created = False
+        finally:
+            _remove(partial_path)
+        return StoredUpload(path, digest, size, filename, created)
+
+
+def _remove(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def _extension(filename: Optional[str]) -> str:
+    """Lower-case file extension, restricted to safe characters"""
+    extension = os.path.splitext(filename or "")[1].lower()
+    return extension if re.fullmatch(r"\.[a-z0-9]{1,8}", extension) else ""
@@ -3,7 +3,7 @@ import cv2
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
 import moviepy.editor as mp
-from moviepy.editor import VideoFileClip, AudioFileClip, TextClip, CompositeVideoClip
+from moviepy.editor import VideoFileClip, TextClip, CompositeVideoClip
 import random
 import time
 from typing import List, Optional, Dict
@@ -11,13 +11,20 @@ import json
 
 from ai_models_ultra_simple import AIVideoGenerator
 from audio_processor import AudioProcessor
+from encoder import EncoderSettings, PCMAudioClip, StillSequence, audio_pcm, decode_audio, write_clip
+from images import KenBurns, load_reel_images
+from mixer import mix
 from text_overlay import TextOverlay
 
+# Lower frame rate for faster processing
+OUTPUT_FPS = 15
+
 class VideoGenerator:
     def __init__(self):
         self.ai_generator = AIVideoGenerator()
         self.audio_processor = AudioProcessor()
         self.text_overlay = TextOverlay()
+        self.encoder_settings = EncoderSettings.from_env()
         
         # Ensure output directory exists
         os.makedirs("outputs", exist_ok=True)
@@ -61,12 +68,11 @@ class VideoGenerator:
             styled_video = final_video
             
             # Step 5: Export final video
-            styled_video.write_videofile(
+            write_clip(
+                styled_video,
                 output_path,
-                fps=15,  # Lower FPS for faster processing
-                codec='libx264',
-                verbose=False,
-                logger=None
+                fps=OUTPUT_FPS,
+                settings=self.encoder_settings
             )
             
             return output_path
@@ -83,24 +89,24 @@ class VideoGenerator:
         clips = []
         duration_per_image = duration / len(image_paths)
         
-        for i, img_path in enumerate(image_paths):
-            # Load and resize image
-            img = Image.open(img_path)
-            
-            # Convert to 9:16 aspect ratio (1080x1920)
-            img_resized = self._resize_to_reel_format(img)
-            
-            # Save temp image
-            temp_img_path = f"temp/temp_img_{i}.jpg"
-            img_resized.save(temp_img_path)
-            
-            # Create video clip from image
-            clip = mp.ImageClip(temp_img_path, duration=duration_per_image)
-            
+        # Decode and fit every upload in memory, in parallel
+        frames = load_reel_images(image_paths)
+        
+        if style not in ("trendy", "business"):
+            # No effect animates the stills, so the exporter holds each one
+            # instead of encoding the same picture for every frame
+            stills = StillSequence(frames, [duration_per_image] * len(frames))
+            return mp.VideoClip(stills, duration=duration)
+        
+        for frame in frames:
             # Add zoom effect based on style
             if style == "trendy":
-                clip = clip.resize(lambda t: 1 + 0.1 * t)  # Slow zoom
-            elif style == "business":
+                # Slow zoom by 10% per second, cropped to the reel canvas
+                zoom = KenBurns(frame, duration_per_image, zoom=(1.0, 1.0 + 0.1 * duration_per_image),
+                                fps=OUTPUT_FPS)
+                clip = mp.VideoClip(zoom, duration=duration_per_image)
+            else:
+                clip = mp.ImageClip(frame, duration=duration_per_image)
                 clip = clip.crossfadein(0.5).crossfadeout(0.5)
             
             clips.append(clip)
@@ -109,36 +115,6 @@ class VideoGenerator:
         final_clip = mp.concatenate_videoclips(clips)
         return final_clip
     
-    def _resize_to_reel_format(self, img: Image.Image) -> Image.Image:
-        """Resize image to 9:16 aspect ratio (1080x1920)"""
-        target_width, target_height = 1080, 1920
-        
-        # Calculate scaling to fit image within target dimensions
-        img_ratio = img.width / img.height
-        target_ratio = target_width / target_height
-        
-        if img_ratio > target_ratio:
-            # Image is wider, scale by height
-            new_height = target_height
-            new_width = int(new_height * img_ratio)
-        else:
-            # Image is taller, scale by width
-            new_width = target_width
-            new_height = int(new_width / img_ratio)
-        
-        # Resize image
-        img_resized = img.resize((new_width, new_height), Image.Resampling.LANCZOS)
-        
-        # Create black background
-        background = Image.new('RGB', (target_width, target_height), (0, 0, 0))
-        
-        # Center the image on the background
-        x_offset = (target_width - new_width) // 2
-        y_offset = (target_height - new_height) // 2
-        background.paste(img_resized, (x_offset, y_offset))
-        
-        return background
-    
     async def _add_text_overlays(
         self, video: VideoFileClip, prompt: str, style: str, trending_data: Optional[Dict]
     ) -> VideoFileClip:
@@ -176,22 +152,14 @@ class VideoGenerator:
         
         if audio_path and os.path.exists(audio_path):
             # Use uploaded audio
-            audio = AudioFileClip(audio_path)
+            music = decode_audio(audio_path, channels=2)
         else:
             # Generate or select trending audio
-            audio = await self.audio_processor.get_audio_for_style(style, duration)
-        
-        # Trim audio to video duration
-        if audio.duration > duration:
-            audio = audio.subclip(0, duration)
-        elif audio.duration < duration:
-            # Loop audio if it's shorter
-            loops = int(duration / audio.duration) + 1
-            audio = mp.concatenate_audioclips([audio] * loops).subclip(0, duration)
-        
-        # Set audio to video
-        video_with_audio = video.set_audio(audio)
-        return video_with_audio
+            music = audio_pcm(await self.audio_processor.get_audio_for_style(style, duration))
+        
+        # Trim the track to the video, looping it if it's shorter
+        soundtrack = mix(None, music, duration)
+        return video.set_audio(PCMAudioClip(soundtrack))
     
     async def _apply_style_effects(
         self, video: VideoFileClip, style: str, trending_data: Optional[Dict]